@@ -2,7 +2,7 @@
 import sys
 
 from PyQt5.QtCore import QRect, QSize, Qt
-from PyQt5.QtGui import QColor, QPixmap, QIcon
+from PyQt5.QtGui import QColor, QPixmap, QIcon, QPalette
 from PyQt5.QtWidgets import QApplication, QLabel
 
 from qframelesswindow import FramelessWindow, StandardTitleBar
@@ -20,15 +20,8 @@ class CustomTitleBar(StandardTitleBar):
         self.minBtn.setPressedColor(Qt.white)
         self.minBtn.setPressedBackgroundColor(QColor(54, 57, 65))
 
-        # use qss to customize title bar button
-        self.maxBtn.setStyleSheet("""
-            TitleBarButton {
-                qproperty-hoverColor: white;
-                qproperty-hoverBackgroundColor: rgb(0, 100, 182);
-                qproperty-pressedColor: white;
-                qproperty-pressedBackgroundColor: rgb(54, 57, 65);
-            }
-        """)
+        # share the style with other title bar buttons
+        self.maxBtn.setButtonStyle(self.minBtn.buttonStyle())
 
 
 class Window(FramelessWindow):
@@ -44,7 +37,11 @@ class Window(FramelessWindow):
 
         self.setWindowIcon(QIcon("screenshot/logo.png"))
         self.setWindowTitle("PyQt-Frameless-Window")
-        self.setStyleSheet("background:white")
+
+        # use palette instead of style sheet, so that title bar is not styled by qss engine
+        palette = self.palette()
+        palette.setColor(QPalette.Window, Qt.white)
+        self.setPalette(palette)
 
         self.titleBar.raise_()
 
@@ -16,40 +16,52 @@ __version__ = "0.8.1"
 __author__ = "zhiyiYo"
 
 import sys
-
-from PyQt5.QtCore import QTimer
-from PyQt5.QtWidgets import QDialog, QMainWindow
-
-from .titlebar import TitleBar, TitleBarButton, SvgTitleBarButton, StandardTitleBar, TitleBarBase
+from importlib import import_module
 
 if sys.platform == "win32":
-    from .windows import AcrylicWindow
-    from .windows import WindowsFramelessWindow as FramelessWindow
-    from .windows import WindowsWindowEffect as WindowEffect
+    _PLATFORM_NAMES = {
+        "AcrylicWindow": (".windows", "AcrylicWindow"),
+        "FramelessWindow": (".windows", "WindowsFramelessWindow"),
+        "WindowEffect": (".windows", "WindowsWindowEffect"),
+    }
 elif sys.platform == "darwin":
-    from .mac import AcrylicWindow
-    from .mac import MacFramelessWindow as FramelessWindow
-    from .mac import MacWindowEffect as WindowEffect
+    _PLATFORM_NAMES = {
+        "AcrylicWindow": (".mac", "AcrylicWindow"),
+        "FramelessWindow": (".mac", "MacFramelessWindow"),
+        "WindowEffect": (".mac", "MacWindowEffect"),
+    }
 else:
-    from .linux import LinuxFramelessWindow as FramelessWindow
-    from .linux import LinuxWindowEffect as WindowEffect
+    _PLATFORM_NAMES = {
+        "AcrylicWindow": (".linux", "AcrylicWindow"),
+        "FramelessWindow": (".linux", "LinuxFramelessWindow"),
+        "WindowEffect": (".linux", "LinuxWindowEffect"),
+    }
 
-    AcrylicWindow = FramelessWindow
+# public names are imported on first use, so that importing the package stays cheap
+_LAZY_NAMES = {
+    "TitleBar": (".titlebar", "TitleBar"),
+    "TitleBarButton": (".titlebar", "TitleBarButton"),
+    "SvgTitleBarButton": (".titlebar", "SvgTitleBarButton"),
+    "StandardTitleBar": (".titlebar", "StandardTitleBar"),
+    "TitleBarBase": (".titlebar", "TitleBarBase"),
+    "TabTitleBar": (".titlebar.tab_title_bar", "TabTitleBar"),
+    "FramelessDialog": (".frameless_window", "FramelessDialog"),
+    "FramelessMainWindow": (".frameless_window", "FramelessMainWindow"),
+    **_PLATFORM_NAMES
+}
 
+__all__ = list(_LAZY_NAMES)
 
-class FramelessDialog(QDialog, FramelessWindow):
-    """ Frameless dialog """
 
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.titleBar.minBtn.hide()
-        self.titleBar.maxBtn.hide()
-        self.titleBar.setDoubleClickEnabled(False)
-        self.windowEffect.disableMaximizeButton(self.winId())
+def __getattr__(name):
+    if name not in _LAZY_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
+    module, attr = _LAZY_NAMES[name]
+    value = getattr(import_module(module, __name__), attr)
+    globals()[name] = value
+    return value
 
-class FramelessMainWindow(QMainWindow, FramelessWindow):
-    """ Frameless main window """
 
-    def __init__(self, parent=None):
-        super().__init__(parent)
\ No newline at end of file
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_NAMES))
@@ -0,0 +1,22 @@
+# coding:utf-8
+from PyQt5.QtWidgets import QDialog, QMainWindow
+
+from . import FramelessWindow
+
+
+class FramelessDialog(QDialog, FramelessWindow):
+    """ Frameless dialog """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.titleBar.minBtn.hide()
+        self.titleBar.maxBtn.hide()
+        self.titleBar.setDoubleClickEnabled(False)
+        self.windowEffect.disableMaximizeButton(self.winId())
+
+
+class FramelessMainWindow(QMainWindow, FramelessWindow):
+    """ Frameless main window """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
@@ -1,11 +1,28 @@
 # coding:utf-8
-from PyQt5.QtCore import QCoreApplication, QEvent, Qt, QSize, QRect
-from PyQt5.QtGui import QMouseEvent
+from PyQt5.QtCore import QEvent, Qt, QSize, QRect
+from PyQt5.QtGui import QColor, QPainter
 from PyQt5.QtWidgets import QWidget
 
 from ..titlebar import TitleBar
-from ..utils.linux_utils import LinuxMoveResize
-from .window_effect import LinuxWindowEffect
+from ..utils.hit_test import EdgeHitTest, ResizeEdge, QT_EDGES
+from ..utils import starSystemResize
+from ..utils.linux_utils import X11Context, isPlatformX11
+from .event_dispatcher import LinuxEventDispatcher
+from .resize_sync import X11ResizeSync
+from .window_effect import CARDINAL, LinuxWindowEffect
+
+
+EDGE_CURSORS = {
+    ResizeEdge.NONE: Qt.ArrowCursor,
+    ResizeEdge.LEFT: Qt.SizeHorCursor,
+    ResizeEdge.RIGHT: Qt.SizeHorCursor,
+    ResizeEdge.TOP: Qt.SizeVerCursor,
+    ResizeEdge.BOTTOM: Qt.SizeVerCursor,
+    ResizeEdge.TOP_LEFT: Qt.SizeFDiagCursor,
+    ResizeEdge.BOTTOM_RIGHT: Qt.SizeFDiagCursor,
+    ResizeEdge.TOP_RIGHT: Qt.SizeBDiagCursor,
+    ResizeEdge.BOTTOM_LEFT: Qt.SizeBDiagCursor,
+}
 
 
 class LinuxFramelessWindow(QWidget):
@@ -19,16 +36,84 @@ class LinuxFramelessWindow(QWidget):
         self.titleBar = TitleBar(self)
         self._isSystemButtonVisible = False
         self._isResizeEnabled = True
+        self._edgeHitTest = EdgeHitTest(self.BORDER_WIDTH)
+
+        # the resize cursor is only changed when the edge class changes
+        self._cursorEdge = None
+        self._cursorShape = None
+        self._cursorChangeCount = 0
+        self._cursorSkipCount = 0
+
+        # the opaque region published to compositor, which is written only when it changes
+        self._opaqueMargins = None
+        self._cornerRadius = 0
+        self._opaqueRegion = None
+
+        # whether to bypass compositor when the window is fullscreen or maximized
+        self._isBypassCompositorEnabled = False
+        self._bypassCompositor = None
+
+        # synchronize the interactive resize with window manager
+        self._resizeSync = X11ResizeSync(self)
 
         self.updateFrameless()
-        QCoreApplication.instance().installEventFilter(self)
+        LinuxEventDispatcher.instance().addWindow(self)
 
         self.titleBar.raise_()
         self.resize(500, 500)
 
+    def event(self, e):
+        result = super().event(e)
+        if e.type() in (QEvent.Paint, QEvent.UpdateRequest):
+            self._resizeSync.onPainted()
+        elif e.type() == QEvent.ContentsRectChange:
+            self._updateContentGeometry()
+        elif e.type() == QEvent.WinIdChange:
+            self.windowEffect.onWinIdChanged()
+
+        return result
+
     def resizeEvent(self, e):
         super().resizeEvent(e)
-        self.titleBar.resize(self.width(), self.titleBar.height())
+        self._resizeSync.onResized()
+        self._updateContentGeometry()
+        self.windowEffect.updateBlurRegion()
+        self.updateOpaqueRegion()
+
+    def showEvent(self, e):
+        super().showEvent(e)
+
+        # intern all the atoms asynchronously before any interaction needs them
+        if isPlatformX11() and not X11Context.instance().atoms.isPrefetched():
+            X11Context.instance().atoms.prefetch()
+
+        self.updateOpaqueRegion()
+        self._updateBypassCompositor()
+        self._resizeSync.attach()
+
+    def hideEvent(self, e):
+        super().hideEvent(e)
+
+        # sync the flags of unmapped native window, which are used when it is mapped again
+        handle = self.windowHandle()
+        if handle is not None and handle.flags() != self.windowFlags():
+            handle.setFlags(self.windowFlags())
+
+    def changeEvent(self, e):
+        super().changeEvent(e)
+        if e.type() == QEvent.WindowStateChange:
+            self._updateBypassCompositor()
+
+    def moveEvent(self, e):
+        super().moveEvent(e)
+        rect = self.contentsRect()
+        self._edgeHitTest.setGeometry(self.x() + rect.x(), self.y() + rect.y(), rect.width(), rect.height())
+
+    def _updateContentGeometry(self):
+        """ place the title bar and resize border inside the content margins, e.g. the client-side shadow """
+        rect = self.contentsRect()
+        self.titleBar.setGeometry(rect.x(), rect.y(), rect.width(), self.titleBar.height())
+        self._edgeHitTest.setGeometry(self.x() + rect.x(), self.y() + rect.y(), rect.width(), rect.height())
 
     def updateFrameless(self):
         self.setWindowFlags(self.windowFlags() | Qt.FramelessWindowHint)
@@ -40,10 +125,23 @@ class LinuxFramelessWindow(QWidget):
     def setStayOnTop(self, isTop: bool):
         """ set the stay on top status """
         if isTop:
-            self.setWindowFlags(self.windowFlags() | Qt.WindowStaysOnTopHint)
+            flags = self.windowFlags() | Qt.WindowStaysOnTopHint
         else:
-            self.setWindowFlags(self.windowFlags() & ~Qt.WindowStaysOnTopHint)
+            flags = self.windowFlags() & ~Qt.WindowStaysOnTopHint
+
+        # changing the window flags recreates the native window, so ask the window manager instead
+        if isPlatformX11() and self.windowHandle() is not None:
+            self.overrideWindowFlags(flags)
 
+            if self.isVisible():
+                X11Context.instance().setNetWmState(int(self.winId()), isTop, "_NET_WM_STATE_ABOVE")
+            else:
+                self.windowHandle().setFlags(flags)
+                self.show()
+
+            return
+
+        self.setWindowFlags(flags)
         self.updateFrameless()
         self.show()
 
@@ -67,10 +165,13 @@ class LinuxFramelessWindow(QWidget):
         self.titleBar = titleBar
         self.titleBar.setParent(self)
         self.titleBar.raise_()
+        self._updateContentGeometry()
 
     def setResizeEnabled(self, isEnabled: bool):
         """ set whether resizing is enabled """
         self._isResizeEnabled = isEnabled
+        if not isEnabled:
+            self._updateCursor(ResizeEdge.NONE)
 
     def isSystemButtonVisible(self):
         """ Returns whether the system title bar button is visible """
@@ -90,36 +191,186 @@ class LinuxFramelessWindow(QWidget):
         """
         return QRect(0, 0, size.width(), size.height())
 
+    def setOpaqueRegionMargins(self, left, top, right, bottom, cornerRadius=0):
+        """ declare that the window is opaque except for the margins and rounded corners,
+        which makes a window with translucent background opaque to compositor
+
+        Parameters
+        ----------
+        left, top, right, bottom: int
+            the translucent margins, e.g. the client-side shadow
+
+        cornerRadius: int
+            the radius of rounded corners of the opaque content
+        """
+        self._opaqueMargins = (left, top, right, bottom)
+        self._cornerRadius = cornerRadius
+        self.updateOpaqueRegion()
+
+    def clearOpaqueRegionMargins(self):
+        """ clear the margins set by `setOpaqueRegionMargins()`, so that the window is regarded
+        as opaque only if its background is not translucent """
+        self._opaqueMargins = None
+        self._cornerRadius = 0
+        self.updateOpaqueRegion()
+
+    def opaqueRegion(self):
+        """ Returns the opaque region of window
+
+        Returns
+        -------
+        rects: List[QRect]
+            opaque rects in window coordinates, empty if the whole window may be translucent
+        """
+        if self.windowOpacity() < 1:
+            return []
+
+        margins = self._opaqueMargins
+        if margins is None:
+            if self.testAttribute(Qt.WA_TranslucentBackground):
+                return []
+
+            margins = (0, 0, 0, 0)
+
+        left, top, right, bottom = margins
+        rect = self.rect().adjusted(left, top, -right, -bottom)
+        r = min(self._cornerRadius, rect.width() // 2, rect.height() // 2)
+        if rect.isEmpty() or r <= 0:
+            return [rect] if not rect.isEmpty() else []
+
+        # exclude the rounded corners
+        return [
+            rect.adjusted(r, 0, -r, -rect.height() + r),
+            rect.adjusted(0, r, 0, -r),
+            rect.adjusted(r, rect.height() - r, -r, 0),
+        ]
+
+    def updateOpaqueRegion(self):
+        """ publish the opaque region as `_NET_WM_OPAQUE_REGION`, the property is written only
+        when the region changes and at most once per event loop turn """
+        if not self.testAttribute(Qt.WA_WState_Created) or not isPlatformX11():
+            return
+
+        winId = int(self.winId())
+        ratio = self.devicePixelRatioF()
+        data = []
+        for rect in self.opaqueRegion():
+            data.extend(round(i * ratio) for i in rect.getRect())
+
+        if (winId, data) != self._opaqueRegion:
+            self._opaqueRegion = (winId, data)
+            X11Context.instance().setProperty(winId, "_NET_WM_OPAQUE_REGION", CARDINAL, data)
+
+    def setBypassCompositorEnabled(self, isEnabled: bool):
+        """ set whether to ask compositor to stop redirecting the window when it is fullscreen
+        or maximized, which avoids the extra copy of each frame for high frame rate contents """
+        self._isBypassCompositorEnabled = isEnabled
+        self._updateBypassCompositor()
+
+    def isBypassCompositorEnabled(self):
+        """ whether bypassing compositor is enabled """
+        return self._isBypassCompositorEnabled
+
+    def _updateBypassCompositor(self):
+        """ set `_NET_WM_BYPASS_COMPOSITOR` according to the window state """
+        if not self.testAttribute(Qt.WA_WState_Created) or not isPlatformX11():
+            return
+
+        isBypass = self._isBypassCompositorEnabled and bool(
+            self.windowState() & (Qt.WindowFullScreen | Qt.WindowMaximized))
+        state = (int(self.winId()), isBypass)
+        if state == self._bypassCompositor or (self._bypassCompositor is None and not isBypass):
+            return
+
+        self._bypassCompositor = state
+        if isBypass:
+            X11Context.instance().setProperty(state[0], "_NET_WM_BYPASS_COMPOSITOR", CARDINAL, [1])
+        else:
+            X11Context.instance().deleteProperty(state[0], "_NET_WM_BYPASS_COMPOSITOR")
+
+    def resizeMetrics(self):
+        """ Returns the metrics of interactive resize, see `X11ResizeSync.metrics()` """
+        return self._resizeSync.metrics()
+
+    def resetResizeMetrics(self):
+        """ reset the metrics of interactive resize """
+        self._resizeSync.resetMetrics()
+
+    def _updateCursor(self, edge):
+        """ update the resize cursor if the edge class is changed """
+        if edge == self._cursorEdge:
+            self._cursorSkipCount += 1
+            return
+
+        self._cursorEdge = edge
+        shape = EDGE_CURSORS[edge]
+        if shape == self._cursorShape:
+            self._cursorSkipCount += 1
+            return
+
+        self._cursorShape = shape
+        self._cursorChangeCount += 1
+        self.setCursor(shape)
+
+    def cursorChangeCounts(self):
+        """ Returns the number of applied and skipped resize cursor changes
+
+        Returns
+        -------
+        counts: Tuple[int, int]
+            `(changed, skipped)`, where `skipped` counts the mouse moves which
+            did not change the cursor shape
+        """
+        return self._cursorChangeCount, self._cursorSkipCount
+
     def eventFilter(self, obj, event):
+        """ Handle the mouse events forwarded by `LinuxEventDispatcher` """
         et = event.type()
         if et != QEvent.MouseButtonPress and et != QEvent.MouseMove or not self._isResizeEnabled:
             return False
 
-        edges = Qt.Edges()
-        pos = QMouseEvent(event).globalPos() - self.pos()
-        if pos.x() < self.BORDER_WIDTH:
-            edges |= Qt.LeftEdge
-        if pos.x() >= self.width()-self.BORDER_WIDTH:
-            edges |= Qt.RightEdge
-        if pos.y() < self.BORDER_WIDTH:
-            edges |= Qt.TopEdge
-        if pos.y() >= self.height()-self.BORDER_WIDTH:
-            edges |= Qt.BottomEdge
+        pos = event.globalPos()
+        edge = self._edgeHitTest.edgeAt(pos.x(), pos.y())
 
         # change cursor
         if et == QEvent.MouseMove and self.windowState() == Qt.WindowNoState:
-            if edges in (Qt.LeftEdge | Qt.TopEdge, Qt.RightEdge | Qt.BottomEdge):
-                self.setCursor(Qt.SizeFDiagCursor)
-            elif edges in (Qt.RightEdge | Qt.TopEdge, Qt.LeftEdge | Qt.BottomEdge):
-                self.setCursor(Qt.SizeBDiagCursor)
-            elif edges in (Qt.TopEdge, Qt.BottomEdge):
-                self.setCursor(Qt.SizeVerCursor)
-            elif edges in (Qt.LeftEdge, Qt.RightEdge):
-                self.setCursor(Qt.SizeHorCursor)
-            else:
-                self.setCursor(Qt.ArrowCursor)
-
-        elif obj in (self, self.titleBar) and et == QEvent.MouseButtonPress and edges:
-            LinuxMoveResize.starSystemResize(self, event.globalPos(), edges)
+            self._updateCursor(edge)
+        elif obj in (self, self.titleBar) and et == QEvent.MouseButtonPress and edge:
+            starSystemResize(self, event.globalPos(), QT_EDGES[edge])
 
         return super().eventFilter(obj, event)
+
+
+class AcrylicWindow(LinuxFramelessWindow):
+    """ A frameless window with acrylic effect, the blur is provided by compositor
+
+    The window is opaque on the platforms other than X11, and it's painted with the
+    opaque tint color until the compositor is known to blur behind windows.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        if isPlatformX11():
+            self.setAttribute(Qt.WA_TranslucentBackground)
+
+        self.windowEffect.setAcrylicEffect(self.winId())
+
+    def opaqueRegion(self):
+        if self.windowEffect.acrylicColor is not None and self.windowEffect.isBlurSupported():
+            return []
+
+        return super().opaqueRegion()
+
+    def paintEvent(self, e):
+        color = self.windowEffect.acrylicColor
+        if color is None:
+            return super().paintEvent(e)
+
+        if not self.windowEffect.isBlurSupported():
+            color = QColor(color)
+            color.setAlpha(255)
+
+        # the shadow margins are kept
+        painter = QPainter(self)
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        painter.fillRect(e.rect() & self.contentsRect(), color)
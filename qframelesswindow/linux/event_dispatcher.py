@@ -0,0 +1,96 @@
+# coding:utf-8
+from weakref import ref
+
+from PyQt5 import sip
+from PyQt5.QtCore import QCoreApplication, QEvent, QObject
+from PyQt5.QtGui import QWindow
+from PyQt5.QtWidgets import QWidget
+
+
+class LinuxEventDispatcher(QObject):
+    """ Process-wide mouse event dispatcher for frameless windows
+
+    Only one application event filter is installed no matter how many frameless
+    windows are created, and each mouse event is forwarded to the window which
+    owns the target object only.
+    """
+
+    _instance = None
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        # the windows are weakly referenced, so that the dispatcher never keeps them alive
+        self._windows = {}      # address of widget -> weak reference of frameless window
+        self._handles = None    # address of QWindow -> weak reference of frameless window, built lazily
+
+    @classmethod
+    def instance(cls):
+        """ Returns the dispatcher instance, create and install it if necessary """
+        if cls._instance is None or sip.isdeleted(cls._instance):
+            app = QCoreApplication.instance()
+            cls._instance = cls(app)
+            app.installEventFilter(cls._instance)
+
+        return cls._instance
+
+    def addWindow(self, window):
+        """ register a frameless window
+
+        Parameters
+        ----------
+        window: QWidget
+            frameless window whose `eventFilter()` receives the mouse events
+        """
+        key = sip.unwrapinstance(window)
+        self._windows[key] = ref(window, lambda r: self._onWindowCollected(key, r))
+        self._handles = None
+        window.destroyed.connect(lambda: self._removeWindow(key))
+
+    def removeWindow(self, window):
+        """ unregister a frameless window """
+        self._removeWindow(sip.unwrapinstance(window))
+
+    def _removeWindow(self, key):
+        self._windows.pop(key, None)
+        self._handles = None
+
+    def _onWindowCollected(self, key, window):
+        # the address may have been reused by another window
+        if self._windows.get(key) is window:
+            self._removeWindow(key)
+
+    def _findWindow(self, obj):
+        """ find the frameless window which owns the object """
+        if isinstance(obj, QWidget):
+            window = self._windows.get(sip.unwrapinstance(obj.window()))
+        elif isinstance(obj, QWindow):
+            if self._handles is None:
+                self._handles = {}
+                for window in self._windows.values():
+                    handle = window() and window().windowHandle()
+                    if handle is not None:
+                        self._handles[sip.unwrapinstance(handle)] = window
+
+            window = self._handles.get(sip.unwrapinstance(obj))
+        else:
+            return None
+
+        return window and window()
+
+    def eventFilter(self, obj, e):
+        et = e.type()
+        if et != QEvent.MouseMove and et != QEvent.MouseButtonPress:
+            # native window may be recreated, e.g. after calling `setWindowFlags()`
+            if et == QEvent.WinIdChange:
+                self._handles = None
+
+            return False
+
+        if not self._windows:
+            return False
+
+        window = self._findWindow(obj)
+        if window is None:
+            return False
+
+        return window.eventFilter(obj, e)
@@ -0,0 +1,94 @@
+# coding:utf-8
+from collections import deque
+
+from PyQt5.QtCore import QElapsedTimer
+
+from ..utils.linux_utils import X11Context, isPlatformX11
+from .window_effect import CARDINAL
+
+
+class X11ResizeSync:
+    """ Records the interactive resize of window
+
+    The `_NET_WM_SYNC_REQUEST` protocol is handled by Qt, which creates the sync counter
+    whenever X server supports the XSync extension and updates it after a frame is flushed,
+    so the counter is only looked up here. The resize steps dropped before being painted
+    and the paint time of each step are recorded.
+    """
+
+    def __init__(self, window, maxPaintTimes=256):
+        """
+        Parameters
+        ----------
+        window: QWidget
+            top level window
+
+        maxPaintTimes: int
+            the maximum number of recorded paint times
+        """
+        self.window = window
+        self.counter = None         # XSync counter of Qt, 0 if it's not created and `None` if unknown
+        self.steps = 0
+        self.dropped = 0
+        self.paintTimes = deque(maxlen=maxPaintTimes)
+
+        self._windowId = None
+        self._isResizePending = False
+        self._clock = QElapsedTimer()
+
+    def attach(self):
+        """ find the sync counter of native window, it should be called when the window is shown """
+        if not isPlatformX11():
+            return
+
+        windowId = int(self.window.winId())
+        if windowId == self._windowId:
+            return
+
+        self._windowId = windowId
+        self.counter = None
+
+        reply = X11Context.instance().getProperty(windowId, "_NET_WM_SYNC_REQUEST_COUNTER", CARDINAL, 1)
+        reply.then(lambda r: self._onCounterReceived(windowId, r))
+
+    def _onCounterReceived(self, windowId, reply):
+        if windowId == self._windowId:
+            self.counter = reply.value.to_atoms()[0] if reply.value_len else 0
+
+    def onResized(self):
+        """ record a resize step, it should be called in `resizeEvent()` """
+        if self._isResizePending:
+            self.dropped += 1
+
+        self.steps += 1
+        self._isResizePending = True
+        self._clock.start()
+
+    def onPainted(self):
+        """ record the paint of window, it should be called after the window handles the paint event """
+        if self._isResizePending:
+            self._isResizePending = False
+            self.paintTimes.append(self._clock.nsecsElapsed() / 1e6)
+
+    def metrics(self):
+        """ Returns the metrics of interactive resize
+
+        Returns
+        -------
+        metrics: dict
+            * `steps`: the number of resize steps
+            * `dropped`: the number of steps which are resized again before being painted
+            * `paintTimes`: the time in milliseconds from each painted step to its paint
+            * `isSynchronized`: whether the window manager can synchronize with the sync counter of Qt
+        """
+        return {
+            "steps": self.steps,
+            "dropped": self.dropped,
+            "paintTimes": list(self.paintTimes),
+            "isSynchronized": bool(self.counter),
+        }
+
+    def resetMetrics(self):
+        """ reset the metrics of interactive resize """
+        self.steps = self.dropped = 0
+        self.paintTimes.clear()
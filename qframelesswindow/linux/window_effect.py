@@ -1,12 +1,31 @@
 # coding:utf-8
+from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import QApplication
+
+from ..utils.linux_utils import X11Context, isPlatformX11
+
+# the predefined atom of `CARDINAL` type
+CARDINAL = 6
 
 
 class LinuxWindowEffect:
     """ Linux window effect """
 
+    # whether the compositor blurs behind windows, which is queried once per process
+    _isBlurSupported = None
+
     def __init__(self, window):
         self.window = window
+        self.acrylicColor = None
+
+        # the blur region of each window, which is written only when it changes. The region
+        # of `window` is keyed on the widget, because its native window may be recreated
+        self._blurRegions = {}
+        self._blurMargins = (0, 0, 0, 0)
+
+        # client-side shadow painted into the transparent margins of window
+        self.shadow = None
 
     def setAcrylicEffect(self, hWnd, gradientColor="F2F2F230", isEnableShadow=True, animationId=0):
         """ set acrylic effect for window
@@ -25,7 +44,14 @@ class LinuxWindowEffect:
         animationId: int
             turn on blur animation or not
         """
-        pass
+        # the tint color is painted by window, e.g. `AcrylicWindow`, and the window
+        # stays opaque if the blur can't be applied
+        if not isPlatformX11():
+            return
+
+        self.acrylicColor = QColor("#" + gradientColor[6:] + gradientColor[:6])
+        self.enableBlurBehindWindow(hWnd)
+        self.window.update()
 
     def setBorderAccentColor(self, hWnd, color: QColor):
         """ Set the border color of the window
@@ -74,7 +100,7 @@ class LinuxWindowEffect:
         hWnd: int or `sip.voidptr`
             Window handle
         """
-        pass
+        self.enableBlurBehindWindow(hWnd)
 
     def setTransparentEffect(self, hWnd):
         """ set transparent effect for window
@@ -94,27 +120,44 @@ class LinuxWindowEffect:
         hWnd : int or `sip.voidptr`
             Window handle
         """
-        pass
+        self.acrylicColor = None
+        self.disableBlurBehindWindow(hWnd)
+        self.window.update()
 
-    def addShadowEffect(self, hWnd):
-        """ add shadow to window
+    def addShadowEffect(self, hWnd, radius=12, color=QColor(0, 0, 0, 80), cornerRadius=0):
+        """ add client-side shadow to window, the window background becomes translucent
+        so it should be called before the window is shown
 
         Parameter
         ----------
         hWnd: int or `sip.voidptr`
             Window handle
+
+        radius: int
+            blur radius, which is also the width of shadow margins
+
+        color: QColor
+            shadow color
+
+        cornerRadius: int
+            the radius of rounded corners of window content
         """
-        pass
+        from .window_shadow import WindowShadow
+
+        if self.shadow is not None:
+            self.shadow.remove()
+
+        self.shadow = WindowShadow(self.window, radius, color, cornerRadius)
 
     def addMenuShadowEffect(self, hWnd):
-        """ add shadow to menu
+        """ add shadow to menu, the menu should only paint inside its contents rect
 
         Parameter
         ----------
         hWnd: int or `sip.voidptr`
             Window handle
         """
-        pass
+        self.addShadowEffect(hWnd, 6, QColor(0, 0, 0, 60))
 
     @staticmethod
     def removeMenuShadowEffect(hWnd):
@@ -135,7 +178,10 @@ class LinuxWindowEffect:
         hWnd: int or `sip.voidptr`
             Window handle
         """
-        pass
+        if self.shadow is not None:
+            self.shadow.remove()
+            self.shadow.deleteLater()
+            self.shadow = None
 
     @staticmethod
     def addWindowAnimation(hWnd):
@@ -165,6 +211,85 @@ class LinuxWindowEffect:
         hWnd: int or `sip.voidptr`
             Window handle
         """
+        if not isPlatformX11():
+            return
+
+        self._blurRegions[self._blurKey(hWnd)] = None
+        self.updateBlurRegion()
+
+    def isBlurSupported(self):
+        """ whether the compositor blurs behind windows, it's `False` until the root window
+        property announced by compositor is received
+
+        Only KWin announces `_KDE_NET_WM_BLUR_BEHIND_REGION` on the root window, so the other
+        compositors are regarded as not blurring, e.g. picom with its blur enabled, and the
+        acrylic window is painted with the opaque tint color there.
+        """
+        cls = LinuxWindowEffect
+        if cls._isBlurSupported is None and isPlatformX11():
+            cls._isBlurSupported = False
+            context = X11Context.instance()
+            reply = context.getProperty(context.rootWindow, "_KDE_NET_WM_BLUR_BEHIND_REGION", 0, 0)
+            reply.then(cls._onBlurSupportReceived)
+
+        return cls._isBlurSupported is True
+
+    @staticmethod
+    def _onBlurSupportReceived(reply):
+        LinuxWindowEffect._isBlurSupported = reply.type != 0
+        if not LinuxWindowEffect._isBlurSupported:
+            return
+
+        # repaint the windows which fall back to opaque tint
+        for widget in QApplication.topLevelWidgets():
+            if isinstance(getattr(widget, "windowEffect", None), LinuxWindowEffect):
+                widget.update()
+
+    def setBlurMargins(self, left, top, right, bottom):
+        """ set the margins excluded from the blur region, e.g. the client-side shadow """
+        self._blurMargins = (left, top, right, bottom)
+        self.updateBlurRegion()
+
+    def updateBlurRegion(self):
+        """ update the blur region after the window is resized, the property is written
+        only if the region changes and at most once per event loop turn """
+        if not self._blurRegions:
+            return
+
+        region = self._blurRegion()
+        for key, oldRegion in self._blurRegions.items():
+            hWnd = self._windowId() if key is self.window else key
+            if region != oldRegion and hWnd:
+                self._blurRegions[key] = region
+                X11Context.instance().setProperty(hWnd, "_KDE_NET_WM_BLUR_BEHIND_REGION", CARDINAL, region)
+
+    def onWinIdChanged(self):
+        """ write the blur region again after the native window is recreated, e.g. to change its visual """
+        if self.window in self._blurRegions:
+            self._blurRegions[self.window] = None
+            self.updateBlurRegion()
+
+    def _blurKey(self, hWnd):
+        hWnd = int(hWnd)
+        return self.window if hWnd == self._windowId() else hWnd
+
+    def _windowId(self):
+        """ Returns the id of native window without creating it, 0 if it's not created """
+        if not self.window.testAttribute(Qt.WA_WState_Created):
+            return 0
+
+        return int(self.window.winId())
+
+    def _blurRegion(self):
+        """ Returns the blur region in device pixels, empty region means the whole window """
+        if not any(self._blurMargins):
+            return []
+
+        ratio = self.window.devicePixelRatioF()
+        left, top, right, bottom = (round(i * ratio) for i in self._blurMargins)
+        width = round(self.window.width() * ratio) - left - right
+        height = round(self.window.height() * ratio) - top - bottom
+        return [left, top, max(width, 0), max(height, 0)]
 
     def removeWindowAnimation(self, hWnd):
         """ Disables maximize and minimize animation of the window by removing the relevant window styles.
@@ -183,3 +308,7 @@ class LinuxWindowEffect:
         hWnd: int or `sip.voidptr`
             Window handle
         """
+        key = self._blurKey(hWnd)
+        if key in self._blurRegions:
+            del self._blurRegions[key]
+            X11Context.instance().deleteProperty(int(hWnd), "_KDE_NET_WM_BLUR_BEHIND_REGION")
@@ -0,0 +1,288 @@
+# coding:utf-8
+from collections import OrderedDict
+
+from PyQt5.QtCore import QEvent, QObject, QRect, QRectF, Qt
+from PyQt5.QtGui import QColor, QImage, QPainter, QPalette, QPixmap
+from PyQt5.QtWidgets import QGraphicsBlurEffect, QGraphicsPixmapItem, QGraphicsScene
+
+from ..utils.linux_utils import X11Context, isPlatformX11
+from .window_effect import CARDINAL
+
+
+class ShadowTiles:
+    """ The 9-slice tiles of a blurred shadow, the center tile is never painted """
+
+    __slots__ = ("corner", "pixmaps")
+
+    def __init__(self, corner: float, pixmaps):
+        """
+        Parameters
+        ----------
+        corner: float
+            logical size of the corner tiles
+
+        pixmaps: List[QPixmap]
+            the tiles in order of top left, top, top right, right,
+            bottom right, bottom, bottom left and left
+        """
+        self.corner = corner
+        self.pixmaps = pixmaps
+
+
+class ShadowTileCache:
+    """ Process-wide LRU cache of shadow tiles
+
+    The shadow is blurred only once for each `(radius, color, corner radius, device pixel ratio)`,
+    resizing the window just blits the cached tiles.
+    """
+
+    _tiles = OrderedDict()
+    _limit = 32
+
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def tiles(cls, radius: int, color: QColor, cornerRadius: int, ratio: float):
+        """ Returns the shadow tiles, they are rendered only on cache miss
+
+        Parameters
+        ----------
+        radius: int
+            blur radius, which is also the width of shadow margins
+
+        color: QColor
+            shadow color
+
+        cornerRadius: int
+            the radius of rounded corners of window content
+
+        ratio: float
+            device pixel ratio
+        """
+        key = (radius, color.rgba(), cornerRadius, ratio)
+        tiles = cls._tiles.get(key)
+        if tiles is not None:
+            cls.hits += 1
+            cls._tiles.move_to_end(key)
+            return tiles
+
+        cls.misses += 1
+        tiles = cls._tiles[key] = cls._render(radius, color, cornerRadius, ratio)
+        while len(cls._tiles) > cls._limit:
+            cls._tiles.popitem(last=False)
+
+        return tiles
+
+    @classmethod
+    def clear(cls):
+        cls._tiles.clear()
+
+    @classmethod
+    def stats(cls):
+        """ Returns the statistics of cache """
+        return {"hits": cls.hits, "misses": cls.misses, "count": len(cls._tiles)}
+
+    @staticmethod
+    def _render(radius, color, cornerRadius, ratio):
+        """ blur a rounded rect whose edges are long enough to contain a whole corner, then cut it into tiles """
+        r = round(radius * ratio)
+        corner = round((radius + max(radius, cornerRadius)) * ratio)
+        center = max(1, round(ratio))
+        size = 2 * corner + center
+        shape = QRectF(r, r, size - 2*r, size - 2*r)
+        xRadius = cornerRadius * ratio
+
+        image = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+        image.fill(Qt.transparent)
+        painter = QPainter(image)
+        painter.setRenderHints(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(color)
+        painter.drawRoundedRect(shape, xRadius, xRadius)
+        painter.end()
+
+        blurred = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+        blurred.fill(Qt.transparent)
+        if r > 0:
+            scene = QGraphicsScene()
+            item = QGraphicsPixmapItem(QPixmap.fromImage(image))
+            effect = QGraphicsBlurEffect()
+            effect.setBlurRadius(r)
+            effect.setBlurHints(QGraphicsBlurEffect.QualityHint)
+            item.setGraphicsEffect(effect)
+            scene.addItem(item)
+
+            painter = QPainter(blurred)
+            scene.render(painter, QRectF(0, 0, size, size), QRectF(0, 0, size, size))
+        else:
+            painter = QPainter(blurred)
+            painter.drawImage(0, 0, image)
+
+        # the content of window covers the shape, so the shadow is only kept outside of it
+        painter.setRenderHints(QPainter.Antialiasing)
+        painter.setCompositionMode(QPainter.CompositionMode_Clear)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(Qt.black)
+        painter.drawRoundedRect(shape, xRadius, xRadius)
+        painter.end()
+
+        c, e = corner, corner + center
+        rects = [
+            QRect(0, 0, c, c), QRect(c, 0, center, c), QRect(e, 0, c, c), QRect(e, c, c, center),
+            QRect(e, e, c, c), QRect(c, e, center, c), QRect(0, e, c, c), QRect(0, c, c, center),
+        ]
+        pixmaps = []
+        for rect in rects:
+            pixmap = QPixmap.fromImage(blurred.copy(rect))
+            pixmap.setDevicePixelRatio(ratio)
+            pixmaps.append(pixmap)
+
+        return ShadowTiles(corner / ratio, pixmaps)
+
+
+class WindowShadow(QObject):
+    """ Client-side shadow painted into the transparent margins of window
+
+    The margins are advertised to window manager as `_GTK_FRAME_EXTENTS`, so that
+    the shadow is not regarded as a part of window when it's placed, snapped or tiled.
+    The shadow is hidden when the window is maximized or in full screen.
+    """
+
+    def __init__(self, window, radius=12, color=QColor(0, 0, 0, 80), cornerRadius=0):
+        """
+        Parameters
+        ----------
+        window: QWidget
+            top level window
+
+        radius: int
+            blur radius, which is also the width of shadow margins
+
+        color: QColor
+            shadow color
+
+        cornerRadius: int
+            the radius of rounded corners of window content
+        """
+        super().__init__(window)
+        self.window = window
+        self.radius = radius
+        self.color = QColor(color)
+        self.cornerRadius = cornerRadius
+        self._margins = None
+        self._frameExtents = None
+
+        # the translucent window has to paint the background which was painted by Qt
+        self._isBackgroundPainted = not window.testAttribute(Qt.WA_TranslucentBackground)
+        if self._isBackgroundPainted:
+            window.setAttribute(Qt.WA_TranslucentBackground)
+
+            # the visual of native window is chosen on creation, so recreate it
+            if window.testAttribute(Qt.WA_WState_Created) and not window.isVisible():
+                window.destroy()
+
+        window.installEventFilter(self)
+        self.updateMargins()
+
+    def remove(self):
+        """ remove the shadow and restore the window """
+        self.window.removeEventFilter(self)
+        self.radius = 0
+        self.updateMargins()
+
+        if self._isBackgroundPainted:
+            self.window.setAttribute(Qt.WA_TranslucentBackground, False)
+            if hasattr(self.window, "clearOpaqueRegionMargins"):
+                self.window.clearOpaqueRegionMargins()
+
+        if self._frameExtents is not None:
+            X11Context.instance().deleteProperty(self._frameExtents[0], "_GTK_FRAME_EXTENTS")
+            self._frameExtents = None
+
+        self.window.update()
+
+    def margin(self):
+        """ Returns the width of shadow margins, which is zero if the window is maximized or in full screen """
+        if self.window.windowState() & (Qt.WindowMaximized | Qt.WindowFullScreen):
+            return 0
+
+        return self.radius
+
+    def updateMargins(self):
+        """ update the content margins and frame extents of window after the shadow margins change """
+        m = self.margin()
+        if m != self._margins:
+            self._margins = m
+            self.window.setContentsMargins(m, m, m, m)
+
+            effect = getattr(self.window, "windowEffect", None)
+            if effect is not None:
+                effect.setBlurMargins(m, m, m, m)
+
+            # the content is only known to be opaque if it was opaque before the shadow is added
+            if self._isBackgroundPainted and hasattr(self.window, "setOpaqueRegionMargins"):
+                self.window.setOpaqueRegionMargins(m, m, m, m, self.cornerRadius)
+
+            self.window.update()
+
+        self._updateFrameExtents()
+
+    def _updateFrameExtents(self):
+        if not self.window.testAttribute(Qt.WA_WState_Created) or not isPlatformX11():
+            return
+
+        m = round(self._margins * self.window.devicePixelRatioF())
+        extents = (int(self.window.winId()), m)
+        if extents != self._frameExtents:
+            self._frameExtents = extents
+            X11Context.instance().setProperty(extents[0], "_GTK_FRAME_EXTENTS", CARDINAL, [m] * 4)
+
+    def paint(self, painter: QPainter, exposed: QRect):
+        """ paint the shadow and the background of content
+
+        Parameters
+        ----------
+        painter: QPainter
+            painter of window
+
+        exposed: QRect
+            the region to be painted
+        """
+        content = self.window.contentsRect()
+        if self._isBackgroundPainted and content.intersects(exposed):
+            painter.fillRect(content & exposed, self.window.palette().color(QPalette.Window))
+
+        if not self._margins or content.contains(exposed):
+            return
+
+        tiles = ShadowTileCache.tiles(self.radius, self.color, self.cornerRadius, self.window.devicePixelRatioF())
+        c = tiles.corner
+        m = self._margins
+        x0, y0 = content.x() - m, content.y() - m
+        x1, y1 = content.right() + 1 + m, content.bottom() + 1 + m
+        w, h = max(0.0, x1 - x0 - 2*c), max(0.0, y1 - y0 - 2*c)
+
+        targets = [
+            QRectF(x0, y0, c, c), QRectF(x0 + c, y0, w, c), QRectF(x1 - c, y0, c, c),
+            QRectF(x1 - c, y0 + c, c, h), QRectF(x1 - c, y1 - c, c, c), QRectF(x0 + c, y1 - c, w, c),
+            QRectF(x0, y1 - c, c, c), QRectF(x0, y0 + c, c, h),
+        ]
+        exposed = QRectF(exposed)
+        for target, pixmap in zip(targets, tiles.pixmaps):
+            if not target.isEmpty() and target.intersects(exposed):
+                painter.drawPixmap(target, pixmap, QRectF(pixmap.rect()))
+
+    def eventFilter(self, obj, e):
+        if obj is not self.window:
+            return False
+
+        et = e.type()
+        if et == QEvent.Paint:
+            painter = QPainter(self.window)
+            self.paint(painter, e.rect())
+            painter.end()
+        elif et == QEvent.WindowStateChange or et == QEvent.Show:
+            self.updateMargins()
+
+        return False
@@ -1,20 +1,37 @@
 # coding:utf-8
 import sys
+from weakref import WeakSet
 
-from PyQt5.QtCore import QEvent, Qt
-from PyQt5.QtGui import QIcon
-from PyQt5.QtWidgets import QHBoxLayout, QLabel, QWidget
+from PyQt5 import sip
+from PyQt5.QtCore import QT_VERSION_STR, QEvent, QPoint, QRect, QSize, Qt, QTimer
+from PyQt5.QtGui import QFont, QFontMetrics, QIcon
+from PyQt5.QtWidgets import QApplication, QHBoxLayout, QLabel, QWidget
 
 from ..utils import startSystemMove
-from .title_bar_buttons import (CloseButton, MaximizeButton, MinimizeButton,
-                                SvgTitleBarButton, TitleBarButton)
+from .drag_region import DragRegion, DragRegionIndex
+from .title_bar_buttons import (CloseButton, MaximizeButton, MinimizeButton, SvgTitleBarButton,
+                                TitleBarButton, TitleBarButtonState, TitleBarButtonStyle)
+
+QT_VERSION = tuple(int(v) for v in QT_VERSION_STR.split('.'))
 
 
 class TitleBarBase(QWidget):
     """ Title bar base class """
 
+    _titleBars = WeakSet()
+    _globalButtonStyles = None
+
     def __init__(self, parent):
         super().__init__(parent)
+        TitleBarBase._titleBars.add(self)
+        self._buttons = []
+        self._isButtonsDirty = True
+        self._buttonsWidth = None
+        self._pressedCount = 0
+        self._dragRegions = []
+        self._dragRegionIndex = DragRegionIndex()
+        self._isDragRegionIndexDirty = False
+
         self.minBtn = MinimizeButton(parent=self)
         self.closeBtn = CloseButton(parent=self)
         self.maxBtn = MaximizeButton(parent=self)
@@ -31,11 +48,29 @@ class TitleBarBase(QWidget):
 
         self.window().installEventFilter(self)
 
+        if TitleBarBase._globalButtonStyles:
+            self.setButtonStyle(*TitleBarBase._globalButtonStyles)
+
+    def event(self, e):
+        if e.type() in (QEvent.ChildAdded, QEvent.ChildRemoved):
+            self._isButtonsDirty = True
+            self._buttonsWidth = None
+            self._isDragRegionIndexDirty = True
+        elif e.type() == QEvent.Resize:
+            self._isDragRegionIndexDirty = True
+
+        return super().event(e)
+
     def eventFilter(self, obj, e):
         if obj is self.window():
             if e.type() == QEvent.WindowStateChange:
                 self.maxBtn.setMaxState(self.window().isMaximized())
+                self._resetPressedButtons()
                 return False
+        elif e.type() in (QEvent.Show, QEvent.Hide, QEvent.Resize, QEvent.Move):
+            # the buttons and drag region widgets are watched to invalidate the cached geometry
+            self._buttonsWidth = None
+            self._isDragRegionIndexDirty = True
 
         return super().eventFilter(obj, e)
 
@@ -47,7 +82,8 @@ class TitleBarBase(QWidget):
         self.__toggleMaxState()
 
     def mouseMoveEvent(self, e):
-        if sys.platform != "win32" or not self.canDrag(e.pos()):
+        # the mouse may be tracked, e.g. by `TabTitleBar`, so only the drag moves window
+        if sys.platform != "win32" or not e.buttons() & Qt.LeftButton or not self.canDrag(e.pos()):
             return
 
         startSystemMove(self.window(), e.globalPos())
@@ -69,23 +105,247 @@ class TitleBarBase(QWidget):
             from ..utils.win32_utils import releaseMouseLeftButton
             releaseMouseLeftButton(self.window().winId())
 
+    def _updateButtons(self):
+        """ find the title bar buttons, it is only called after the children change """
+        buttons = self.findChildren(TitleBarButton)
+        oldButtons = set(self._buttons)
+
+        for button in oldButtons - set(buttons):
+            if not sip.isdeleted(button):
+                button.removeEventFilter(self)
+                button.pressedChanged.disconnect(self._onButtonPressedChanged)
+
+        for button in buttons:
+            button.installEventFilter(self)
+            if button not in oldButtons:
+                button.pressedChanged.connect(self._onButtonPressedChanged)
+
+        self._buttons = buttons
+        self._isButtonsDirty = False
+        self._buttonsWidth = None
+        self._pressedCount = sum(i.isPressed() for i in buttons)
+
+    def _onButtonPressedChanged(self, isPressed):
+        self._pressedCount += 1 if isPressed else -1
+
+    def _resetPressedButtons(self):
+        """ reset the stale pressed state of buttons """
+        if not self._hasButtonPressed():
+            return
+
+        for button in self._buttons:
+            if button.isPressed():
+                button.setState(TitleBarButtonState.NORMAL)
+
+    def _getButtonsWidth(self):
+        """ Returns the total width of visible buttons, which is cached until the buttons change """
+        if self._buttonsWidth is None:
+            if self._isButtonsDirty:
+                self._updateButtons()
+
+            self._buttonsWidth = sum(i.width() for i in self._buttons if i.isVisible())
+
+        return self._buttonsWidth
+
     def _isDragRegion(self, pos):
         """ Check whether the position belongs to the area where dragging is allowed """
-        width = 0
-        for button in self.findChildren(TitleBarButton):
-            if button.isVisible():
-                width += button.width()
+        region = self.dragRegionAt(pos)
+        if region != DragRegion.NONE:
+            return region == DragRegion.DRAG
 
-        return 0 < pos.x() < self.width() - width
+        return 0 < pos.x() < self.width() - self._getButtonsWidth()
 
     def _hasButtonPressed(self):
         """ whether any button is pressed """
-        return any(btn.isPressed() for btn in self.findChildren(TitleBarButton))
+        if self._isButtonsDirty:
+            self._updateButtons()
+
+        return self._pressedCount > 0
 
     def canDrag(self, pos):
         """ whether the position is draggable """
         return self._isDragRegion(pos) and not self._hasButtonPressed()
 
+    def addDragRegion(self, region):
+        """ add a region where dragging is allowed, it takes precedence over the no-drag regions
+
+        Parameters
+        ----------
+        region: QWidget | QRect
+            a child widget of title bar, or a rect in title bar coordinates
+        """
+        self._addDragRegion(region, DragRegion.DRAG)
+
+    def addNoDragRegion(self, region):
+        """ add a region where dragging is not allowed
+
+        Parameters
+        ----------
+        region: QWidget | QRect
+            a child widget of title bar, or a rect in title bar coordinates
+        """
+        self._addDragRegion(region, DragRegion.NO_DRAG)
+
+    def removeDragRegion(self, region):
+        """ remove the drag or no-drag region
+
+        Parameters
+        ----------
+        region: QWidget | QRect
+            the region added before
+        """
+        self._dragRegions = [i for i in self._dragRegions if i[0] is not region and i[0] != region]
+        if isinstance(region, QWidget):
+            self._unwatchDragRegions([region])
+
+        self._isDragRegionIndexDirty = True
+
+    def clearDragRegions(self):
+        """ remove all the drag and no-drag regions """
+        widgets = [i[0] for i in self._dragRegions if isinstance(i[0], QWidget)]
+        self._dragRegions.clear()
+        self._unwatchDragRegions(widgets)
+        self._isDragRegionIndexDirty = True
+
+    def dragRegionAt(self, pos: QPoint):
+        """ Returns the type of the registered region which contains the position
+
+        Parameters
+        ----------
+        pos: QPoint
+            position in title bar coordinates
+
+        Returns
+        -------
+        region: DragRegion
+            region type, `DragRegion.NONE` if the position is not in any registered region
+        """
+        if not self._dragRegions:
+            return DragRegion.NONE
+
+        if self._isDragRegionIndexDirty:
+            self._updateDragRegionIndex()
+
+        return self._dragRegionIndex.regionAt(pos.x(), pos.y())
+
+    def _addDragRegion(self, region, type):
+        if isinstance(region, QWidget):
+            if any(i[0] is region for i in self._dragRegions):
+                self.removeDragRegion(region)
+
+            region.destroyed.connect(self._onDragRegionDestroyed)
+
+            # watch the widget and its ancestors, because moving them changes the region
+            widget = region
+            while widget is not None and widget is not self:
+                widget.installEventFilter(self)
+                widget = widget.parentWidget()
+        else:
+            region = QRect(region)
+
+        self._dragRegions.append((region, type))
+        self._isDragRegionIndexDirty = True
+
+    def _unwatchDragRegions(self, regions):
+        """ disconnect the removed region widgets and remove the event filter from the widgets
+        which are not watched for the remaining regions or other reasons """
+        watched = self._watchedWidgets()
+        for region, _ in self._dragRegions:
+            widget = region if isinstance(region, QWidget) else None
+            while widget is not None and widget is not self:
+                watched.add(widget)
+                widget = widget.parentWidget()
+
+        for region in regions:
+            if sip.isdeleted(region):
+                continue
+
+            region.destroyed.disconnect(self._onDragRegionDestroyed)
+            widget = region
+            while widget is not None and widget is not self:
+                if widget not in watched:
+                    widget.removeEventFilter(self)
+
+                widget = widget.parentWidget()
+
+    def _watchedWidgets(self):
+        """ Returns the children whose events are filtered apart from the drag regions """
+        return set(self.findChildren(TitleBarButton))
+
+    def _onDragRegionDestroyed(self):
+        self._isDragRegionIndexDirty = True
+
+    def _updateDragRegionIndex(self):
+        """ rebuild the drag region index, it is only called after the regions change """
+        self._dragRegions = [
+            i for i in self._dragRegions if not (isinstance(i[0], QWidget) and sip.isdeleted(i[0]))]
+
+        regions = []
+        for region, type in self._dragRegions:
+            if isinstance(region, QWidget):
+                if not self.isAncestorOf(region) or not region.isVisibleTo(self):
+                    continue
+
+                rect = QRect(region.mapTo(self, QPoint(0, 0)), region.size())
+            else:
+                rect = region
+
+            regions.append((rect.x(), rect.y(), rect.x() + rect.width(), rect.y() + rect.height(), type))
+
+        self._dragRegionIndex.build(regions)
+        self._isDragRegionIndexDirty = False
+
+    def setButtonStyle(self, style: TitleBarButtonStyle, closeButtonStyle: TitleBarButtonStyle = None):
+        """ set the style of all title bar buttons, each button is repainted once
+
+        Parameters
+        ----------
+        style: TitleBarButtonStyle
+            button style
+
+        closeButtonStyle: TitleBarButtonStyle
+            the style of close button, same as `style` if it's `None`
+        """
+        for button in self.findChildren(TitleBarButton):
+            if closeButtonStyle is not None and isinstance(button, CloseButton):
+                button.setButtonStyle(closeButtonStyle)
+            else:
+                button.setButtonStyle(style)
+
+    @classmethod
+    def setGlobalButtonStyle(cls, style: TitleBarButtonStyle, closeButtonStyle: TitleBarButtonStyle = None):
+        """ set the button style of all the existing and new title bars, e.g. when switching theme
+
+        Parameters
+        ----------
+        style: TitleBarButtonStyle
+            button style, `None` means the title bars created later keep their own style
+
+        closeButtonStyle: TitleBarButtonStyle
+            the style of close button, same as `style` if it's `None`
+        """
+        TitleBarBase._globalButtonStyles = (style, closeButtonStyle) if style else None
+        if not style:
+            return
+
+        for titleBar in list(TitleBarBase._titleBars):
+            if not sip.isdeleted(titleBar):
+                titleBar.setButtonStyle(style, closeButtonStyle)
+
+    def setButtonAnimationEnabled(self, isEnabled: bool, duration=150):
+        """ set whether to animate the state transition of title bar buttons
+
+        Parameters
+        ----------
+        isEnabled: bool
+            whether to enable animation
+
+        duration: int
+            the duration of transition in milliseconds
+        """
+        for button in self.findChildren(TitleBarButton):
+            button.setAnimationEnabled(isEnabled, duration)
+
     def setDoubleClickEnabled(self, isEnabled):
         """ whether to switch window maximization status when double clicked
 
@@ -114,12 +374,111 @@ class TitleBar(TitleBarBase):
         self.hBoxLayout.addWidget(self.maxBtn, 0, Qt.AlignRight)
         self.hBoxLayout.addWidget(self.closeBtn, 0, Qt.AlignRight)
 
+        # the fixed buttons are placed without layout until custom items are added to layout
+        self._isLayoutFree = False
+        for button in (self.minBtn, self.maxBtn, self.closeBtn):
+            button.installEventFilter(self)
+
+        self._updateLayoutMode()
+
+    def event(self, e):
+        if e.type() in (QEvent.ChildAdded, QEvent.ChildRemoved):
+            # the disabled layout never requests layout, and the child is added to layout
+            # after it's reparented, so check the layout mode in a posted layout request
+            self._isLayoutModeDirty = True
+            QApplication.postEvent(self, QEvent(QEvent.LayoutRequest))
+        elif e.type() == QEvent.LayoutRequest and hasattr(self, "hBoxLayout"):
+            self._updateLayoutMode()
+
+        return super().event(e)
+
+    def eventFilter(self, obj, e):
+        if self._isLayoutFree and e.type() in (QEvent.Show, QEvent.Hide) and obj.parent() is self:
+            self._placeButtons()
+
+        return super().eventFilter(obj, e)
+
+    def resizeEvent(self, e):
+        # the items without widget, e.g. spacing and margins, don't notify the disabled
+        # layout, so the cheap check of layout mode is repeated before placing buttons
+        if self._isLayoutFree or getattr(self, "_isLayoutModeDirty", False):
+            self._updateLayoutMode()
+
+        super().resizeEvent(e)
+
+    def _canPlaceButtons(self):
+        """ whether the layout only contains a stretch and the fixed buttons """
+        layout = self.hBoxLayout
+        if layout.count() != 4 or layout.itemAt(0).spacerItem() is None:
+            return False
+
+        if layout.spacing() > 0 or not layout.contentsMargins().isNull():
+            return False
+
+        widgets = [layout.itemAt(i).widget() for i in range(1, 4)]
+        return widgets == [self.minBtn, self.maxBtn, self.closeBtn]
+
+    def _updateLayoutMode(self):
+        """ enable the layout only when it contains custom items """
+        self._isLayoutModeDirty = False
+        isLayoutFree = self._canPlaceButtons()
+
+        if isLayoutFree != self._isLayoutFree:
+            self._isLayoutFree = isLayoutFree
+            self.hBoxLayout.setEnabled(not isLayoutFree)
+            if not isLayoutFree:
+                self.hBoxLayout.invalidate()
+                self.hBoxLayout.activate()
+
+        if isLayoutFree:
+            self._placeButtons()
+
+    def _placeButtons(self):
+        """ align the visible buttons to the right """
+        x = self.width()
+        for button in (self.closeBtn, self.maxBtn, self.minBtn):
+            if button.isHidden():
+                continue
+
+            x -= button.width()
+            button.move(x, (self.height() - button.height()) // 2)
+
+
+TITLE_LABEL_QSS = """
+    QLabel{
+        background: transparent;
+        font: 13px 'Segoe UI', 'Microsoft YaHei', 'PingFang SC';
+        padding: 0 4px
+    }
+"""
+
+TITLE_LABEL_FONT = QFont()
+TITLE_LABEL_FONT.setPixelSize(13)
+
+# `QFont.setFamilies()` is only available since Qt 5.13
+if QT_VERSION >= (5, 13, 0):
+    TITLE_LABEL_FONT.setFamilies(['Segoe UI', 'Microsoft YaHei', 'PingFang SC'])
+else:
+    TITLE_LABEL_FONT.setFamily('Segoe UI')
+    QFont.insertSubstitutions('Segoe UI', ['Microsoft YaHei', 'PingFang SC'])
+
 
 class StandardTitleBar(TitleBar):
     """ Title bar with icon and title """
 
     def __init__(self, parent):
         super().__init__(parent)
+        self._title = ""
+        self._icon = None
+        self._iconKey = None
+        self._titleMetrics = None
+
+        # title and icon changes are applied once per event loop turn
+        self._updateTimer = QTimer(self)
+        self._updateTimer.setSingleShot(True)
+        self._updateTimer.setInterval(0)
+        self._updateTimer.timeout.connect(self._updateTitleAndIcon)
+
         # add window icon
         self.iconLabel = QLabel(self)
         self.iconLabel.setFixedSize(20, 20)
@@ -130,32 +489,115 @@ class StandardTitleBar(TitleBar):
         # add title label
         self.titleLabel = QLabel(self)
         self.hBoxLayout.insertWidget(2, self.titleLabel, 0, Qt.AlignLeft)
-        self.titleLabel.setStyleSheet("""
-            QLabel{
-                background: transparent;
-                font: 13px 'Segoe UI', 'Microsoft YaHei', 'PingFang SC';
-                padding: 0 4px
-            }
-        """)
+        self.titleLabel.installEventFilter(self)
+        self._isTitleLabelQss = None
+        self._screenHandle = None
+        self._updateTitleLabelStyle()
         self.window().windowTitleChanged.connect(self.setTitle)
 
+    def event(self, e):
+        if e.type() == QEvent.StyleChange:
+            self._updateTitleLabelStyle()
+        elif e.type() == QEvent.Resize and self._title:
+            self._scheduleUpdate()
+        elif e.type() == QEvent.Show:
+            # the icon pixmap depends on the device pixel ratio of screen
+            # connect only once, `Qt.UniqueConnection` raises for the python slots connected before
+            handle = self.window().windowHandle()
+            if handle is not None and handle is not self._screenHandle:
+                self._screenHandle = handle
+                handle.screenChanged.connect(self._scheduleUpdate)
+
+        return super().event(e)
+
+    def eventFilter(self, obj, e):
+        if obj is self.titleLabel and e.type() in (QEvent.FontChange, QEvent.StyleChange):
+            # the label may be restyled by user, so the cached metrics are out of date
+            self._titleMetrics = None
+            self._scheduleUpdate()
+
+        return super().eventFilter(obj, e)
+
+    def _watchedWidgets(self):
+        return super()._watchedWidgets() | {self.titleLabel}
+
+    def _updateTitleLabelStyle(self):
+        """ style the title label with font and margins, the style sheet is only used
+        when the title bar is styled by the style sheet of its ancestors or application """
+        isQss = bool(QApplication.instance() and QApplication.instance().styleSheet())
+        widget = self
+        while not isQss and widget is not None:
+            isQss = bool(widget.styleSheet())
+            widget = widget.parentWidget()
+
+        if isQss == self._isTitleLabelQss:
+            return
+
+        self._isTitleLabelQss = isQss
+        if isQss:
+            # the inherited rules may change the background and font of label
+            self.titleLabel.setContentsMargins(0, 0, 0, 0)
+            self.titleLabel.setStyleSheet(TITLE_LABEL_QSS)
+        else:
+            self.titleLabel.setStyleSheet("")
+            self.titleLabel.setFont(TITLE_LABEL_FONT)
+
+            # the padding of style sheet is counted twice by QLabel, keep the same look
+            self.titleLabel.setContentsMargins(8, 0, 8, 0)
+
+        self.titleLabel.adjustSize()
+
     def setTitle(self, title):
-        """ set the title of title bar
+        """ set the title of title bar, the label is updated in the next event loop turn
 
         Parameters
         ----------
         title: str
             the title of title bar
         """
-        self.titleLabel.setText(title)
-        self.titleLabel.adjustSize()
+        self._title = title
+        self._scheduleUpdate()
+
+    def title(self):
+        """ Returns the title of title bar """
+        return self._title
 
     def setIcon(self, icon):
-        """ set the icon of title bar
+        """ set the icon of title bar, the label is updated in the next event loop turn
 
         Parameters
         ----------
         icon: QIcon | QPixmap | str
             the icon of title bar
         """
-        self.iconLabel.setPixmap(QIcon(icon).pixmap(20, 20))
+        self._icon = QIcon(icon)
+        self._scheduleUpdate()
+
+    def _scheduleUpdate(self):
+        if not self._updateTimer.isActive():
+            self._updateTimer.start()
+
+    def _updateTitleAndIcon(self):
+        """ apply the pending title and icon """
+        if self._icon is not None:
+            key = (self._icon.cacheKey(), self.devicePixelRatioF())
+            if key != self._iconKey:
+                self._iconKey = key
+                self.iconLabel.setPixmap(self._icon.pixmap(self.window().windowHandle(), QSize(20, 20)))
+
+        label = self.titleLabel
+        if self._titleMetrics is None:
+            label.ensurePolished()
+            self._titleMetrics = QFontMetrics(label.font())
+
+        # elide the title if there is not enough space on the left of buttons
+        metrics = self._titleMetrics
+        padding = label.sizeHint().width() - metrics.horizontalAdvance(label.text())
+        width = self.width() - label.x() - self._getButtonsWidth() - padding
+        text = self._title
+        if width > 0 and metrics.horizontalAdvance(text) > width:
+            text = metrics.elidedText(text, Qt.ElideRight, width)
+
+        if text != label.text():
+            label.setText(text)
+            label.adjustSize()
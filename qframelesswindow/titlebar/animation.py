@@ -0,0 +1,135 @@
+# coding:utf-8
+from PyQt5 import sip
+from PyQt5.QtCore import QCoreApplication, QElapsedTimer, QObject, Qt, QTimer
+from PyQt5.QtGui import QColor, QGuiApplication
+
+
+class ColorTransition:
+    """ Color transition of title bar button, the current color is interpolated in place """
+
+    def __init__(self, widget, duration=150):
+        """
+        Parameters
+        ----------
+        widget: QWidget
+            the widget repainted on each frame
+
+        duration: int
+            the duration of transition in milliseconds
+        """
+        self.widget = widget
+        self.duration = duration
+        self.progress = 1.0
+        self.value = 1.0
+        self.color = QColor()
+        self.startColor = QColor()
+        self.endColor = QColor()
+        self._start = (0, 0, 0, 0)
+        self._delta = (0, 0, 0, 0)
+        self._startTime = 0
+
+    def isRunning(self):
+        return self.progress < 1
+
+    def start(self, startColor: QColor, endColor: QColor, now: int):
+        """ start transition
+
+        Parameters
+        ----------
+        startColor, endColor: QColor
+            the start and end color of transition
+
+        now: int
+            current time in milliseconds of ticker clock
+        """
+        self.startColor, self.endColor = QColor(startColor), QColor(endColor)
+        self._start = startColor.getRgb()
+        self._delta = tuple(e - s for s, e in zip(self._start, endColor.getRgb()))
+        self._startTime = now
+        self.progress = self.value = 0.0
+        self.color.setRgb(*self._start)
+
+    def stop(self):
+        self.progress = self.value = 1.0
+
+    def step(self, now: int):
+        """ advance the transition, returns `True` when it is finished """
+        if sip.isdeleted(self.widget):
+            self.stop()
+            return True
+
+        t = min(1.0, (now - self._startTime) / self.duration) if self.duration > 0 else 1.0
+        self.progress = t
+
+        # ease out quad
+        k = self.value = t * (2 - t)
+        r, g, b, a = self._start
+        dr, dg, db, da = self._delta
+        self.color.setRgb(int(r + dr*k), int(g + dg*k), int(b + db*k), int(a + da*k))
+
+        self.widget.update()
+        return t >= 1
+
+
+class TitleBarAnimationTicker(QObject):
+    """ Process-wide frame ticker which drives the transitions of all title bar buttons
+
+    Only one timer is used no matter how many buttons there are, its interval is
+    capped at the refresh rate of screens and it is stopped when no transition runs.
+    """
+
+    _instance = None
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self._transitions = []
+        self._clock = QElapsedTimer()
+        self._clock.start()
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self._tick)
+
+    @classmethod
+    def instance(cls):
+        """ Returns the ticker instance, create it if necessary """
+        if cls._instance is None or sip.isdeleted(cls._instance):
+            cls._instance = cls(QCoreApplication.instance())
+
+        return cls._instance
+
+    def now(self):
+        """ Returns current time in milliseconds of ticker clock """
+        return self._clock.elapsed()
+
+    def addTransition(self, transition: ColorTransition):
+        """ drive the transition until it is finished """
+        if transition not in self._transitions:
+            self._transitions.append(transition)
+
+        if not self.timer.isActive():
+            self.timer.start(self._frameInterval())
+
+    def removeTransition(self, transition: ColorTransition):
+        """ stop driving the transition """
+        if transition in self._transitions:
+            self._transitions.remove(transition)
+
+        if not self._transitions:
+            self.timer.stop()
+
+    def isActive(self):
+        """ whether the ticker is running """
+        return self.timer.isActive()
+
+    def _frameInterval(self):
+        """ Returns the frame interval in milliseconds according to the fastest screen """
+        rates = [i.refreshRate() for i in QGuiApplication.screens()]
+        rate = max(rates, default=0) or 60
+        return max(1, round(1000 / rate))
+
+    def _tick(self):
+        now = self.now()
+        self._transitions = [i for i in self._transitions if not i.step(now)]
+        if not self._transitions:
+            self.timer.stop()
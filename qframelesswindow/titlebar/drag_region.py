@@ -0,0 +1,66 @@
+# coding:utf-8
+from bisect import bisect_right
+from enum import Enum
+
+
+class DragRegion(Enum):
+    """ Drag region type """
+    NONE = 0
+    DRAG = 1
+    NO_DRAG = 2
+
+
+class DragRegionIndex:
+    """ Sorted interval index of drag and no-drag regions
+
+    The regions are split into disjoint horizontal segments, so a hit test costs
+    a binary search plus a check of the few regions covering the segment.
+    """
+
+    def __init__(self):
+        self._starts = []
+        self._ends = []
+        self._segments = []
+
+    def build(self, regions):
+        """ rebuild the index
+
+        Parameters
+        ----------
+        regions: Iterable[Tuple[int, int, int, int, DragRegion]]
+            regions in `(left, top, right, bottom, type)` format, right and bottom are exclusive
+        """
+        regions = [r for r in regions if r[0] < r[2] and r[1] < r[3]]
+        events = sorted({r[0] for r in regions} | {r[2] for r in regions})
+
+        byStart, byEnd = {}, {}
+        for r in regions:
+            byStart.setdefault(r[0], []).append(r)
+            byEnd.setdefault(r[2], []).append(r)
+
+        self._starts, self._ends, self._segments = [], [], []
+        active = []
+        for x0, x1 in zip(events, events[1:]):
+            active = [r for r in active if r not in byEnd.get(x0, ())]
+            active.extend(byStart.get(x0, ()))
+            if not active:
+                continue
+
+            # drag regions take precedence, so they can make a hole in a no-drag widget
+            segment = [(r[1], r[3], r[4]) for r in active if r[4] == DragRegion.DRAG]
+            segment += [(r[1], r[3], r[4]) for r in active if r[4] != DragRegion.DRAG]
+            self._starts.append(x0)
+            self._ends.append(x1)
+            self._segments.append(segment)
+
+    def regionAt(self, x, y):
+        """ Returns the type of region which contains the point """
+        i = bisect_right(self._starts, x) - 1
+        if i < 0 or x >= self._ends[i]:
+            return DragRegion.NONE
+
+        for y0, y1, region in self._segments[i]:
+            if y0 <= y < y1:
+                return region
+
+        return DragRegion.NONE
@@ -0,0 +1,130 @@
+# coding:utf-8
+from collections import OrderedDict
+
+from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtGui import QColor, QGuiApplication, QPainter, QPixmap
+
+
+class TitleBarGlyphCache:
+    """ Process-wide LRU cache of the glyph pixmaps shared by all title bar buttons """
+
+    _pixmaps = OrderedDict()
+    _cost = 0
+    _limit = 2048 * 1024
+    _isScreenWatched = False
+
+    hits = 0
+    misses = 0
+    evictions = 0
+
+    @classmethod
+    def pixmap(cls, kind, color: QColor, size: QSize, ratio: float, draw):
+        """ Returns the glyph pixmap, it is rendered only on cache miss
+
+        Parameters
+        ----------
+        kind: Hashable
+            glyph kind, e.g. `"minimize"`
+
+        color: QColor
+            glyph color
+
+        size: QSize
+            logical size of pixmap
+
+        ratio: float
+            device pixel ratio of pixmap
+
+        draw: Callable[[QPainter, QColor], None]
+            function used to draw the glyph on a transparent pixmap
+        """
+        key = (kind, color.rgba(), size.width(), size.height(), ratio)
+        pixmap = cls._pixmaps.get(key)
+        if pixmap is not None:
+            cls.hits += 1
+            cls._pixmaps.move_to_end(key)
+            return pixmap
+
+        cls.misses += 1
+        cls._watchScreens()
+
+        pixmap = QPixmap(size * ratio)
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+
+        painter = QPainter(pixmap)
+        draw(painter, color)
+        painter.end()
+
+        cls._pixmaps[key] = pixmap
+        cls._cost += cls._pixmapCost(pixmap)
+        cls._evict()
+        return pixmap
+
+    @classmethod
+    def setCacheLimit(cls, kb: int):
+        """ set the memory limit of cache in kilobytes """
+        cls._limit = kb * 1024
+        cls._evict()
+
+    @classmethod
+    def cacheLimit(cls):
+        """ Returns the memory limit of cache in kilobytes """
+        return cls._limit // 1024
+
+    @classmethod
+    def stats(cls):
+        """ Returns the statistics of cache """
+        return {
+            "hits": cls.hits,
+            "misses": cls.misses,
+            "evictions": cls.evictions,
+            "count": len(cls._pixmaps),
+            "cost": cls._cost,
+        }
+
+    @classmethod
+    def clear(cls):
+        """ remove all the cached pixmaps """
+        cls._pixmaps.clear()
+        cls._cost = 0
+
+    @classmethod
+    def _evict(cls):
+        """ remove the least recently used pixmaps until the cost is within limit """
+        while cls._pixmaps and cls._cost > cls._limit:
+            _, pixmap = cls._pixmaps.popitem(last=False)
+            cls._cost -= cls._pixmapCost(pixmap)
+            cls.evictions += 1
+
+    @staticmethod
+    def _pixmapCost(pixmap: QPixmap):
+        return pixmap.width() * pixmap.height() * pixmap.depth() // 8
+
+    @classmethod
+    def _watchScreens(cls):
+        """ invalidate the pixmaps when the device pixel ratio of screens changes """
+        app = QGuiApplication.instance()
+        if cls._isScreenWatched or app is None:
+            return
+
+        cls._isScreenWatched = True
+        for screen in app.screens():
+            cls._watchScreen(screen)
+
+        app.screenAdded.connect(cls._watchScreen)
+        app.screenRemoved.connect(lambda _: cls._removeStalePixmaps())
+
+    @classmethod
+    def _watchScreen(cls, screen):
+        screen.logicalDotsPerInchChanged.connect(lambda _: cls._removeStalePixmaps())
+        screen.physicalDotsPerInchChanged.connect(lambda _: cls._removeStalePixmaps())
+        screen.geometryChanged.connect(lambda _: cls._removeStalePixmaps())
+
+    @classmethod
+    def _removeStalePixmaps(cls):
+        """ remove the pixmaps whose device pixel ratio is not used by any screen """
+        ratios = {screen.devicePixelRatio() for screen in QGuiApplication.screens()}
+        for key in [k for k in cls._pixmaps if k[-1] not in ratios]:
+            cls._cost -= cls._pixmapCost(cls._pixmaps.pop(key))
+            cls.evictions += 1
@@ -0,0 +1,351 @@
+# coding:utf-8
+from PyQt5.QtCore import QEvent, QPoint, QRect, QRectF, Qt, pyqtSignal
+from PyQt5.QtGui import (QColor, QIcon, QPainter, QPalette, QStandardItem, QStandardItemModel,
+                         QStaticText, QTransform)
+from PyQt5.QtWidgets import QHBoxLayout
+
+from . import TitleBarBase
+from .drag_region import DragRegion
+
+
+class TabTitleBar(TitleBarBase):
+    """ Title bar with a virtualized tab strip
+
+    The tabs are painted from a list model instead of being widgets, so only the
+    geometry of visible tabs is computed no matter how many tabs there are.
+    """
+
+    currentChanged = pyqtSignal(int)
+
+    TAB_WIDTH = 180
+    TAB_SPACING = 6
+    TAB_MARGIN = 8
+    TAB_TOP = 4
+    ICON_SIZE = 16
+
+    # maximum number of cached tab labels
+    LABEL_CACHE_SIZE = 512
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self._model = None
+        self._currentIndex = -1
+        self._hoverIndex = -1
+        self._scrollOffset = 0
+        self._tabWidth = self.TAB_WIDTH
+        self._tabSpacing = self.TAB_SPACING
+        self._visibleTabs = []
+        self._tabLayoutKey = None
+        self._labels = {}
+
+        self._selectedColor = QColor(255, 255, 255, 200)
+        self._hoverColor = QColor(0, 0, 0, 15)
+
+        self.hBoxLayout = QHBoxLayout(self)
+        self.hBoxLayout.setSpacing(0)
+        self.hBoxLayout.setContentsMargins(0, 0, 0, 0)
+        self.hBoxLayout.setAlignment(Qt.AlignVCenter | Qt.AlignLeft)
+        self.hBoxLayout.addStretch(1)
+        self.hBoxLayout.addWidget(self.minBtn, 0, Qt.AlignRight)
+        self.hBoxLayout.addWidget(self.maxBtn, 0, Qt.AlignRight)
+        self.hBoxLayout.addWidget(self.closeBtn, 0, Qt.AlignRight)
+
+        self.setMouseTracking(True)
+        self.setModel(QStandardItemModel(self))
+
+    def setModel(self, model):
+        """ set the list model of tabs, the display and decoration roles are painted
+
+        Parameters
+        ----------
+        model: QAbstractItemModel
+            list model
+        """
+        if self._model is not None:
+            self._model.rowsInserted.disconnect(self._onRowsInserted)
+            self._model.rowsRemoved.disconnect(self._onRowsRemoved)
+            self._model.modelReset.disconnect(self._onModelReset)
+            self._model.layoutChanged.disconnect(self._onModelReset)
+            self._model.dataChanged.disconnect(self.update)
+
+        self._model = model
+        model.rowsInserted.connect(self._onRowsInserted)
+        model.rowsRemoved.connect(self._onRowsRemoved)
+        model.modelReset.connect(self._onModelReset)
+        model.layoutChanged.connect(self._onModelReset)
+        model.dataChanged.connect(self.update)
+        self._onModelReset()
+
+    def model(self):
+        """ Returns the list model of tabs """
+        return self._model
+
+    def addTab(self, text: str, icon=None):
+        """ add tab to the end and return its index
+
+        Parameters
+        ----------
+        text: str
+            the text of tab
+
+        icon: QIcon | str
+            the icon of tab
+        """
+        return self.insertTab(self.count(), text, icon)
+
+    def insertTab(self, index: int, text: str, icon=None):
+        """ insert tab and return its index, it only works for `QStandardItemModel`
+
+        Parameters
+        ----------
+        index: int
+            the index of tab
+
+        text: str
+            the text of tab
+
+        icon: QIcon | str
+            the icon of tab
+        """
+        index = max(0, min(index, self.count()))
+        item = QStandardItem(text)
+        if icon is not None:
+            item.setIcon(QIcon(icon))
+
+        self._model.insertRow(index, item)
+        return index
+
+    def removeTab(self, index: int):
+        """ remove tab """
+        if 0 <= index < self.count():
+            self._model.removeRow(index)
+
+    def count(self):
+        """ Returns the number of tabs """
+        return self._model.rowCount()
+
+    def tabText(self, index: int):
+        """ Returns the text of tab """
+        return self._model.index(index, 0).data(Qt.DisplayRole) or ""
+
+    def setTabText(self, index: int, text: str):
+        """ set the text of tab """
+        self._model.setData(self._model.index(index, 0), text, Qt.DisplayRole)
+
+    def currentIndex(self):
+        """ Returns the index of selected tab, -1 if there are no tabs """
+        return self._currentIndex
+
+    def setCurrentIndex(self, index: int):
+        """ select tab """
+        if not 0 <= index < self.count() or index == self._currentIndex:
+            return
+
+        self._currentIndex = index
+        self.ensureVisible(index)
+        self.update()
+        self.currentChanged.emit(index)
+
+    def setTabWidth(self, width: int):
+        """ set the width of each tab """
+        self._tabWidth = max(1, width)
+        self._labels.clear()
+        self.setScrollOffset(self._scrollOffset)
+        self.update()
+
+    def tabWidth(self):
+        """ Returns the width of each tab """
+        return self._tabWidth
+
+    def setTabSpacing(self, spacing: int):
+        """ set the draggable gap between tabs """
+        self._tabSpacing = max(0, spacing)
+        self.setScrollOffset(self._scrollOffset)
+        self.update()
+
+    def tabSpacing(self):
+        """ Returns the gap between tabs """
+        return self._tabSpacing
+
+    def scrollOffset(self):
+        """ Returns the horizontal scroll offset of tab strip """
+        return self._scrollOffset
+
+    def setScrollOffset(self, offset: int):
+        """ scroll the tab strip """
+        offset = max(0, min(offset, self._maxScrollOffset()))
+        if offset != self._scrollOffset:
+            self._scrollOffset = offset
+            self._hoverIndex = -1
+            self.update()
+
+    def ensureVisible(self, index: int):
+        """ scroll the tab strip to make the tab visible """
+        x = self.TAB_MARGIN + index * self._tabStep()
+        if x < self._scrollOffset:
+            self.setScrollOffset(x)
+        elif x + self._tabWidth > self._scrollOffset + self._stripWidth():
+            self.setScrollOffset(x + self._tabWidth - self._stripWidth())
+
+    def tabAt(self, pos: QPoint):
+        """ Returns the index of tab at the position, -1 if the position is not on any tab """
+        if pos.y() < self.TAB_TOP or not 0 <= pos.x() < self._stripWidth():
+            return -1
+
+        x = pos.x() + self._scrollOffset - self.TAB_MARGIN
+        step = self._tabStep()
+        index = x // step
+        if x < 0 or index >= self.count() or x - index * step >= self._tabWidth:
+            return -1
+
+        return index
+
+    def tabRect(self, index: int):
+        """ Returns the rect of tab in title bar coordinates """
+        x = self.TAB_MARGIN + index * self._tabStep() - self._scrollOffset
+        return QRect(x, self.TAB_TOP, self._tabWidth, self.height() - self.TAB_TOP)
+
+    def visibleTabs(self):
+        """ Returns the `(index, rect)` list of visible tabs, which is cached until the layout changes """
+        key = (self._scrollOffset, self._stripWidth(), self.height(), self.count(),
+               self._tabWidth, self._tabSpacing)
+        if key == self._tabLayoutKey:
+            return self._visibleTabs
+
+        step = self._tabStep()
+        first = max(0, (self._scrollOffset - self.TAB_MARGIN) // step)
+        last = min(self.count(), (self._scrollOffset + self._stripWidth() - self.TAB_MARGIN) // step + 1)
+
+        self._visibleTabs = [(i, self.tabRect(i)) for i in range(first, last)]
+        self._tabLayoutKey = key
+        return self._visibleTabs
+
+    def _tabStep(self):
+        return self._tabWidth + self._tabSpacing
+
+    def _stripWidth(self):
+        return self.width() - self._getButtonsWidth()
+
+    def _maxScrollOffset(self):
+        contentWidth = 2 * self.TAB_MARGIN + self.count() * self._tabStep() - self._tabSpacing
+        return max(0, contentWidth - self._stripWidth())
+
+    def _isDragRegion(self, pos):
+        region = self.dragRegionAt(pos)
+        if region != DragRegion.NONE:
+            return region == DragRegion.DRAG
+
+        return super()._isDragRegion(pos) and self.tabAt(pos) < 0
+
+    def _onRowsInserted(self, parent, first, last):
+        if self._currentIndex >= first:
+            self._currentIndex += last - first + 1
+        elif self._currentIndex < 0:
+            self.setCurrentIndex(first)
+
+        self.update()
+
+    def _onRowsRemoved(self, parent, first, last):
+        if self._currentIndex > last:
+            self._currentIndex -= last - first + 1
+        elif self._currentIndex >= first:
+            self._currentIndex = -1
+            self.setCurrentIndex(min(first, self.count() - 1))
+
+        self.setScrollOffset(self._scrollOffset)
+        self.update()
+
+    def _onModelReset(self):
+        self._currentIndex = -1
+        self._hoverIndex = -1
+        self.setCurrentIndex(0)
+        self.setScrollOffset(self._scrollOffset)
+        self.update()
+
+    def _label(self, text: str, width: int):
+        """ Returns the cached label of tab, which is elided to the width """
+        key = (text, width)
+        label = self._labels.get(key)
+        if label is None:
+            if len(self._labels) >= self.LABEL_CACHE_SIZE:
+                self._labels.clear()
+
+            label = QStaticText(self.fontMetrics().elidedText(text, Qt.ElideRight, width))
+            label.setTextFormat(Qt.PlainText)
+            label.prepare(QTransform(), self.font())
+            self._labels[key] = label
+
+        return label
+
+    def changeEvent(self, e):
+        if e.type() == QEvent.FontChange:
+            self._labels.clear()
+
+        super().changeEvent(e)
+
+    def mousePressEvent(self, e):
+        index = self.tabAt(e.pos())
+        if index < 0:
+            return super().mousePressEvent(e)
+
+        if e.button() == Qt.LeftButton:
+            self.setCurrentIndex(index)
+
+    def mouseMoveEvent(self, e):
+        index = self.tabAt(e.pos())
+        if index != self._hoverIndex:
+            self._hoverIndex = index
+            self.update()
+
+        super().mouseMoveEvent(e)
+
+    def mouseDoubleClickEvent(self, e):
+        if self.tabAt(e.pos()) < 0:
+            super().mouseDoubleClickEvent(e)
+
+    def leaveEvent(self, e):
+        if self._hoverIndex >= 0:
+            self._hoverIndex = -1
+            self.update()
+
+        super().leaveEvent(e)
+
+    def wheelEvent(self, e):
+        delta = e.angleDelta().y() or e.angleDelta().x()
+        self.setScrollOffset(self._scrollOffset - delta * self._tabStep() // 120)
+
+    def paintEvent(self, e):
+        painter = QPainter(self)
+        painter.setRenderHints(QPainter.Antialiasing)
+        painter.setClipRect(0, 0, self._stripWidth(), self.height())
+        textColor = self.palette().color(QPalette.WindowText)
+        exposed = e.rect()
+
+        for index, rect in self.visibleTabs():
+            if not rect.intersects(exposed):
+                continue
+
+            # draw background
+            if index == self._currentIndex:
+                painter.setPen(Qt.NoPen)
+                painter.setBrush(self._selectedColor)
+                painter.drawRoundedRect(QRectF(rect).adjusted(0, 0, 0, 6), 6, 6)
+            elif index == self._hoverIndex:
+                painter.setPen(Qt.NoPen)
+                painter.setBrush(self._hoverColor)
+                painter.drawRoundedRect(QRectF(rect).adjusted(0, 0, 0, 6), 6, 6)
+
+            # draw icon
+            modelIndex = self._model.index(index, 0)
+            x = rect.x() + 10
+            icon = modelIndex.data(Qt.DecorationRole)
+            if isinstance(icon, QIcon) and not icon.isNull():
+                s = self.ICON_SIZE
+                icon.paint(painter, QRect(x, rect.center().y() - s // 2, s, s))
+                x += s + 8
+
+            # draw text
+            label = self._label(modelIndex.data(Qt.DisplayRole) or "", rect.right() - x - 10)
+            painter.setPen(textColor)
+            y = rect.y() + (rect.height() - label.size().height()) / 2
+            painter.drawStaticText(QPoint(x, int(y)), label)
@@ -1,13 +1,13 @@
 # coding:utf-8
 from enum import Enum
+from weakref import WeakValueDictionary
 
-from PyQt5.QtCore import QFile, QPointF, QRectF, Qt, pyqtProperty
+from PyQt5.QtCore import QFile, QPointF, QRectF, Qt, pyqtProperty, pyqtSignal
 from PyQt5.QtGui import QColor, QPainter, QPainterPath, QPen
 from PyQt5.QtWidgets import QAbstractButton
-from PyQt5.QtSvg import QSvgRenderer
-from PyQt5.QtXml import QDomDocument
 
-from .._rc import resource
+from .animation import ColorTransition, TitleBarAnimationTicker
+from .glyph_cache import TitleBarGlyphCache
 
 
 class TitleBarButtonState(Enum):
@@ -17,24 +17,87 @@ class TitleBarButtonState(Enum):
     PRESSED = 2
 
 
+class TitleBarButtonStyle:
+    """ Immutable colors of title bar button
+
+    Styles with the same colors are the same object, so a style can be shared
+    between any number of buttons without copying the colors.
+    """
+
+    __slots__ = ("_colors", "__weakref__")
+    _styles = WeakValueDictionary()
+
+    FIELDS = ("normalColor", "hoverColor", "pressedColor",
+              "normalBackgroundColor", "hoverBackgroundColor", "pressedBackgroundColor")
+
+    def __new__(cls, normalColor=QColor(0, 0, 0), hoverColor=QColor(0, 0, 0), pressedColor=QColor(0, 0, 0),
+                normalBackgroundColor=QColor(0, 0, 0, 0), hoverBackgroundColor=QColor(0, 0, 0, 26),
+                pressedBackgroundColor=QColor(0, 0, 0, 51)):
+        """
+        Parameters
+        ----------
+        normalColor, hoverColor, pressedColor: QColor
+            icon color in each state
+
+        normalBackgroundColor, hoverBackgroundColor, pressedBackgroundColor: QColor
+            background color in each state
+        """
+        colors = tuple(QColor(c) for c in (
+            normalColor, hoverColor, pressedColor,
+            normalBackgroundColor, hoverBackgroundColor, pressedBackgroundColor))
+        key = tuple(c.rgba() for c in colors)
+
+        style = cls._styles.get(key)
+        if style is None:
+            style = super().__new__(cls)
+            object.__setattr__(style, "_colors", colors)
+            cls._styles[key] = style
+
+        return style
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __reduce__(self):
+        return (self.__class__, self._colors)
+
+    def __repr__(self):
+        colors = ", ".join(f"{n}={c.name(QColor.HexArgb)}" for n, c in zip(self.FIELDS, self._colors))
+        return f"{self.__class__.__name__}({colors})"
+
+    def replace(self, **colors):
+        """ Returns a style with some colors replaced, e.g. `style.replace(hoverColor=Qt.white)` """
+        return TitleBarButtonStyle(**{**dict(zip(self.FIELDS, self._colors)), **colors})
+
+    # the colors are copied, so that the shared style can't be modified
+    normalColor = property(lambda self: QColor(self._colors[0]))
+    hoverColor = property(lambda self: QColor(self._colors[1]))
+    pressedColor = property(lambda self: QColor(self._colors[2]))
+    normalBackgroundColor = property(lambda self: QColor(self._colors[3]))
+    hoverBackgroundColor = property(lambda self: QColor(self._colors[4]))
+    pressedBackgroundColor = property(lambda self: QColor(self._colors[5]))
+
+
+# the default style is kept alive, so that it's shared by all the buttons
+DEFAULT_BUTTON_STYLE = TitleBarButtonStyle()
+
+
 class TitleBarButton(QAbstractButton):
     """ Title bar button """
 
+    pressedChanged = pyqtSignal(bool)
+
     def __init__(self, parent=None):
         super().__init__(parent=parent)
         self.setCursor(Qt.ArrowCursor)
         self.setFixedSize(46, 32)
         self._state = TitleBarButtonState.NORMAL
+        self._setColors(DEFAULT_BUTTON_STYLE)
 
-        # icon color
-        self._normalColor = QColor(0, 0, 0)
-        self._hoverColor = QColor(0, 0, 0)
-        self._pressedColor = QColor(0, 0, 0)
-
-        # background color
-        self._normalBgColor = QColor(0, 0, 0, 0)
-        self._hoverBgColor = QColor(0, 0, 0, 26)
-        self._pressedBgColor = QColor(0, 0, 0, 51)
+        # state transition
+        self._isAnimationEnabled = False
+        self._colorTransition = ColorTransition(self)
+        self._bgColorTransition = ColorTransition(self)
 
     def setState(self, state):
         """ set the state of button
@@ -44,36 +107,117 @@ class TitleBarButton(QAbstractButton):
         state: TitleBarButtonState
             the state of button
         """
-        self._state = state
+        isPressed = self.isPressed()
+
+        if self._isAnimationEnabled and self.isVisible() and state != self._state:
+            color, bgColor = self._getColors()
+            self._state = state
+            self._startTransition(color, bgColor)
+        else:
+            self._state = state
+            if self._bgColorTransition.isRunning():
+                self._stopTransition()
+
         self.update()
 
+        if isPressed != self.isPressed():
+            self.pressedChanged.emit(not isPressed)
+
     def isPressed(self):
         """ whether the button is pressed """
         return self._state == TitleBarButtonState.PRESSED
 
+    def setAnimationEnabled(self, isEnabled: bool, duration=150):
+        """ set whether to animate the color transition when the state changes
+
+        Parameters
+        ----------
+        isEnabled: bool
+            whether to enable animation
+
+        duration: int
+            the duration of transition in milliseconds
+        """
+        self._isAnimationEnabled = isEnabled
+        self._colorTransition.duration = duration
+        self._bgColorTransition.duration = duration
+
+        if not isEnabled:
+            self._stopTransition()
+
+    def isAnimationEnabled(self):
+        """ whether the color transition is animated """
+        return self._isAnimationEnabled
+
+    def _startTransition(self, color, bgColor):
+        """ start the transition from the colors to the colors of current state """
+        ticker = TitleBarAnimationTicker.instance()
+        endColor, endBgColor = self._getStateColors()
+        now = ticker.now()
+
+        self._colorTransition.start(color, endColor, now)
+        self._bgColorTransition.start(bgColor, endBgColor, now)
+        ticker.addTransition(self._colorTransition)
+        ticker.addTransition(self._bgColorTransition)
+
+    def _stopTransition(self):
+        ticker = TitleBarAnimationTicker.instance()
+        for transition in (self._colorTransition, self._bgColorTransition):
+            transition.stop()
+            ticker.removeTransition(transition)
+
+        self.update()
+
+    def setButtonStyle(self, style: TitleBarButtonStyle):
+        """ set all the colors of button with a single repaint
+
+        Parameters
+        ----------
+        style: TitleBarButtonStyle
+            button style, which is shared instead of copied
+        """
+        self._setColors(style)
+        if self._bgColorTransition.isRunning():
+            self._stopTransition()
+
+        self.update()
+
+    def buttonStyle(self):
+        """ Returns the style of button """
+        return TitleBarButtonStyle(*self._getAllColors())
+
+    def _setColors(self, style: TitleBarButtonStyle):
+        # the colors of style are shared, the getters return copies and the setters replace them
+        (self._normalColor, self._hoverColor, self._pressedColor,
+         self._normalBgColor, self._hoverBgColor, self._pressedBgColor) = style._colors
+
+    def _getAllColors(self):
+        return (self._normalColor, self._hoverColor, self._pressedColor,
+                self._normalBgColor, self._hoverBgColor, self._pressedBgColor)
+
     def getNormalColor(self):
         """ get the icon color of the button in normal state """
-        return self._normalColor
+        return QColor(self._normalColor)
 
     def getHoverColor(self):
         """ get the icon color of the button in hover state """
-        return self._hoverColor
+        return QColor(self._hoverColor)
 
     def getPressedColor(self):
         """ get the icon color of the button in pressed state """
-        return self._pressedColor
+        return QColor(self._pressedColor)
 
     def getNormalBackgroundColor(self):
         """ get the background color of the button in normal state """
-        return self._normalBgColor
+        return QColor(self._normalBgColor)
 
     def getHoverBackgroundColor(self):
         """ get the background color of the button in hover state """
-        return self._hoverBgColor
+        return QColor(self._hoverBgColor)
 
     def getPressedBackgroundColor(self):
         """ get the background color of the button in pressed state """
-        return self._pressedBgColor
+        return QColor(self._pressedBgColor)
 
     def setNormalColor(self, color):
         """ set the icon color of the button in normal state
@@ -156,8 +300,42 @@ class TitleBarButton(QAbstractButton):
         self.setState(TitleBarButtonState.PRESSED)
         super().mousePressEvent(e)
 
+    def _drawGlyph(self, painter, color):
+        """ draw the icon glyph on a transparent pixmap with the size of button """
+        pass
+
+    def _glyphKind(self):
+        """ Returns the kind of icon glyph, which is used as cache key """
+        return self.__class__.__name__
+
+    def _paintGlyph(self, painter, color):
+        """ paint the cached icon glyph """
+        transition = self._colorTransition
+        if transition.isRunning() and transition.startColor != transition.endColor:
+            # cross fade the cached glyphs instead of rendering a glyph for each frame
+            opacity = painter.opacity()
+            painter.setOpacity(opacity * (1 - transition.value))
+            self._paintCachedGlyph(painter, transition.startColor)
+            painter.setOpacity(opacity * transition.value)
+            self._paintCachedGlyph(painter, transition.endColor)
+            painter.setOpacity(opacity)
+        else:
+            self._paintCachedGlyph(painter, color)
+
+    def _paintCachedGlyph(self, painter, color):
+        pixmap = TitleBarGlyphCache.pixmap(
+            self._glyphKind(), color, self.size(), self.devicePixelRatioF(), self._drawGlyph)
+        painter.drawPixmap(self.rect(), pixmap)
+
     def _getColors(self):
         """ get the icon color and background color """
+        if self._bgColorTransition.isRunning():
+            return self._colorTransition.endColor, self._bgColorTransition.color
+
+        return self._getStateColors()
+
+    def _getStateColors(self):
+        """ get the icon color and background color of current state """
         if self._state == TitleBarButtonState.NORMAL:
             return self._normalColor, self._normalBgColor
         elif self._state == TitleBarButtonState.HOVER:
@@ -189,8 +367,11 @@ class SvgTitleBarButton(TitleBarButton):
         parent: QWidget
             parent widget
         """
+        from PyQt5.QtXml import QDomDocument
+
         super().__init__(parent)
         self._svgDom = QDomDocument()
+        self._svgContent = b""
         self.setIcon(iconPath)
 
     def setIcon(self, iconPath):
@@ -201,10 +382,32 @@ class SvgTitleBarButton(TitleBarButton):
         iconPath: str
             the path of icon
         """
+        # register the built-in icons
+        from .._rc import resource
+
         f = QFile(iconPath)
         f.open(QFile.ReadOnly)
-        self._svgDom.setContent(f.readAll())
+        self._svgContent = bytes(f.readAll())
+        self._svgDom.setContent(self._svgContent)
         f.close()
+        self.update()
+
+    def _glyphKind(self):
+        return ("svg", self._svgContent)
+
+    def _drawGlyph(self, painter, color):
+        from PyQt5.QtSvg import QSvgRenderer
+        from PyQt5.QtXml import QDomDocument
+
+        dom = QDomDocument()
+        dom.setContent(self._svgContent)
+        pathNodes = dom.elementsByTagName('path')
+        for i in range(pathNodes.length()):
+            element = pathNodes.at(i).toElement()
+            element.setAttribute('stroke', color.name())
+
+        painter.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
+        QSvgRenderer(dom.toByteArray()).render(painter, QRectF(self.rect()))
 
     def paintEvent(self, e):
         painter = QPainter(self)
@@ -217,19 +420,18 @@ class SvgTitleBarButton(TitleBarButton):
         painter.drawRect(self.rect())
 
         # draw icon
-        color = color.name()
-        pathNodes = self._svgDom.elementsByTagName('path')
-        for i in range(pathNodes.length()):
-            element = pathNodes.at(i).toElement()
-            element.setAttribute('stroke', color)
-
-        renderer = QSvgRenderer(self._svgDom.toByteArray())
-        renderer.render(painter, QRectF(self.rect()))
+        self._paintGlyph(painter, color)
 
 
 class MinimizeButton(TitleBarButton):
     """ Minimize button """
 
+    def _drawGlyph(self, painter, color):
+        pen = QPen(color, 1)
+        pen.setCosmetic(True)
+        painter.setPen(pen)
+        painter.drawLine(18, 16, 28, 16)
+
     def paintEvent(self, e):
         painter = QPainter(self)
         color, bgColor = self._getColors()
@@ -240,11 +442,7 @@ class MinimizeButton(TitleBarButton):
         painter.drawRect(self.rect())
 
         # draw icon
-        painter.setBrush(Qt.NoBrush)
-        pen = QPen(color, 1)
-        pen.setCosmetic(True)
-        painter.setPen(pen)
-        painter.drawLine(18, 16, 28, 16)
+        self._paintGlyph(painter, color)
 
 
 class MaximizeButton(TitleBarButton):
@@ -262,16 +460,10 @@ class MaximizeButton(TitleBarButton):
         self._isMax = isMax
         self.setState(TitleBarButtonState.NORMAL)
 
-    def paintEvent(self, e):
-        painter = QPainter(self)
-        color, bgColor = self._getColors()
-
-        # draw background
-        painter.setBrush(bgColor)
-        painter.setPen(Qt.NoPen)
-        painter.drawRect(self.rect())
+    def _glyphKind(self):
+        return "restore" if self._isMax else "maximize"
 
-        # draw icon
+    def _drawGlyph(self, painter, color):
         painter.setBrush(Qt.NoBrush)
         pen = QPen(color, 1)
         pen.setCosmetic(True)
@@ -293,13 +485,27 @@ class MaximizeButton(TitleBarButton):
             path.lineTo(x0+8*r-dw, y0-dw+8*r)
             painter.drawPath(path)
 
+    def paintEvent(self, e):
+        painter = QPainter(self)
+        color, bgColor = self._getColors()
+
+        # draw background
+        painter.setBrush(bgColor)
+        painter.setPen(Qt.NoPen)
+        painter.drawRect(self.rect())
+
+        # draw icon
+        self._paintGlyph(painter, color)
+
+
+CLOSE_BUTTON_STYLE = TitleBarButtonStyle(
+    hoverColor=Qt.white, pressedColor=Qt.white,
+    hoverBackgroundColor=QColor(232, 17, 35), pressedBackgroundColor=QColor(241, 112, 122))
+
 
 class CloseButton(SvgTitleBarButton):
     """ Close button """
 
     def __init__(self, parent=None):
         super().__init__(":/qframelesswindow/close.svg", parent)
-        self.setHoverColor(Qt.white)
-        self.setPressedColor(Qt.white)
-        self.setHoverBackgroundColor(QColor(232, 17, 35))
-        self.setPressedBackgroundColor(QColor(241, 112, 122))
+        self.setButtonStyle(CLOSE_BUTTON_STYLE)
@@ -1,18 +1,27 @@
 # coding:utf-8
 import sys
 
+from .move_resize import (MoveResizeBackend, MoveResizeBackendRegistry, QtNativeMoveResize,
+                          RecordingMoveResize, MOVE_RESIZE_BACKEND_ENV)
+
 if sys.platform == "win32":
     from .win32_utils import WindowsMoveResize as MoveResize
     from .win32_utils import getSystemAccentColor
     from .win32_utils import WindowsScreenCaptureFilter as ScreenCaptureFilter
+    MoveResizeBackendRegistry.register("win32", MoveResize)
 elif sys.platform == "darwin":
     from .mac_utils import MacMoveResize as MoveResize
     from .mac_utils import getSystemAccentColor
     from .mac_utils import MacScreenCaptureFilter as ScreenCaptureFilter
+    MoveResizeBackendRegistry.register("cocoa", MoveResize)
 else:
     from .linux_utils import LinuxMoveResize as MoveResize
     from .linux_utils import getSystemAccentColor
     from .linux_utils import LinuxScreenCaptureFilter as ScreenCaptureFilter
+    MoveResizeBackendRegistry.register("xcb", MoveResize)
+
+MoveResizeBackendRegistry.register("qt-native", QtNativeMoveResize)
+MoveResizeBackendRegistry.register("recording", RecordingMoveResize)
 
 
 def startSystemMove(window, globalPos):
@@ -26,7 +35,7 @@ def startSystemMove(window, globalPos):
     globalPos: QPoint
         the global point of mouse release event
     """
-    MoveResize.startSystemMove(window, globalPos)
+    MoveResizeBackendRegistry.current().startSystemMove(window, globalPos)
 
 
 def starSystemResize(window, globalPos, edges):
@@ -43,4 +52,21 @@ def starSystemResize(window, globalPos, edges):
     edges: `Qt.Edges`
         window edges
     """
-    MoveResize.starSystemResize(window, globalPos, edges)
+    MoveResizeBackendRegistry.current().starSystemResize(window, globalPos, edges)
+
+
+def setMoveResizeBackend(name):
+    """ set the backend used to move and resize window
+
+    Parameters
+    ----------
+    name: str
+        the name of backend, e.g. `xcb`, `qt-native` or `recording`, the backend
+        is probed again if it's `None`
+    """
+    MoveResizeBackendRegistry.setCurrent(name)
+
+
+def moveResizeBackend():
+    """ Returns the name of backend used to move and resize window """
+    return MoveResizeBackendRegistry.currentName()
@@ -0,0 +1,188 @@
+# coding:utf-8
+from enum import IntEnum
+
+from PyQt5.QtCore import Qt
+
+
+class ResizeEdge(IntEnum):
+    """ Resize edge class """
+    NONE = 0
+    LEFT = 1
+    TOP = 2
+    RIGHT = 3
+    BOTTOM = 4
+    TOP_LEFT = 5
+    TOP_RIGHT = 6
+    BOTTOM_LEFT = 7
+    BOTTOM_RIGHT = 8
+
+
+# edge class indexed by the bit mask `left | right << 1 | top << 2 | bottom << 3`,
+# opposite edges can only be hit together when the window is smaller than its borders
+_EDGE_TABLE = (
+    ResizeEdge.NONE,            # -
+    ResizeEdge.LEFT,            # left
+    ResizeEdge.RIGHT,           # right
+    ResizeEdge.LEFT,            # left | right
+    ResizeEdge.TOP,             # top
+    ResizeEdge.TOP_LEFT,        # top | left
+    ResizeEdge.TOP_RIGHT,       # top | right
+    ResizeEdge.TOP_LEFT,        # top | left | right
+    ResizeEdge.BOTTOM,          # bottom
+    ResizeEdge.BOTTOM_LEFT,     # bottom | left
+    ResizeEdge.BOTTOM_RIGHT,    # bottom | right
+    ResizeEdge.BOTTOM_LEFT,     # bottom | left | right
+    ResizeEdge.TOP,             # bottom | top
+    ResizeEdge.TOP_LEFT,        # bottom | top | left
+    ResizeEdge.TOP_RIGHT,       # bottom | top | right
+    ResizeEdge.TOP_LEFT,        # bottom | top | left | right
+)
+
+QT_EDGES = {
+    ResizeEdge.NONE: Qt.Edges(),
+    ResizeEdge.LEFT: Qt.Edges(Qt.LeftEdge),
+    ResizeEdge.TOP: Qt.Edges(Qt.TopEdge),
+    ResizeEdge.RIGHT: Qt.Edges(Qt.RightEdge),
+    ResizeEdge.BOTTOM: Qt.Edges(Qt.BottomEdge),
+    ResizeEdge.TOP_LEFT: Qt.TopEdge | Qt.LeftEdge,
+    ResizeEdge.TOP_RIGHT: Qt.TopEdge | Qt.RightEdge,
+    ResizeEdge.BOTTOM_LEFT: Qt.BottomEdge | Qt.LeftEdge,
+    ResizeEdge.BOTTOM_RIGHT: Qt.BottomEdge | Qt.RightEdge,
+}
+
+
+class EdgeHitTest:
+    """ Platform-neutral resize edge hit test
+
+    The window rectangle and the inner rectangle which can not hit any edge are
+    cached, so most of the points are rejected by a single containment test.
+    """
+
+    def __init__(self, borderWidth=5, cornerWidth=None):
+        """
+        Parameters
+        ----------
+        borderWidth: int
+            the width of the resize border on each edge
+
+        cornerWidth: int
+            the length of the corner zone along each edge, same as `borderWidth` if it's `None`
+        """
+        self._x = self._y = self._width = self._height = 0
+        self._borders = (borderWidth, ) * 4
+        self._corners = self._borders if cornerWidth is None else (cornerWidth, ) * 4
+        self._updateInnerRect()
+
+    def setBorderWidths(self, left, top, right, bottom):
+        """ set the width of resize border for each edge """
+        self._borders = (left, top, right, bottom)
+        self._updateInnerRect()
+
+    def borderWidths(self):
+        """ Returns the width of resize border as a `(left, top, right, bottom)` tuple """
+        return self._borders
+
+    def setCornerWidths(self, left, top, right, bottom):
+        """ set the length of the corner zone for each edge
+
+        Parameters
+        ----------
+        left, top, right, bottom: int
+            a point on the top or bottom border is treated as a corner if it is closer
+            than `left` or `right` to the side edges, and vice versa
+        """
+        self._corners = (left, top, right, bottom)
+        self._updateInnerRect()
+
+    def cornerWidths(self):
+        """ Returns the length of corner zone as a `(left, top, right, bottom)` tuple """
+        return self._corners
+
+    def setGeometry(self, x, y, width, height):
+        """ update the cached window rect, it should be called when the window is moved or resized """
+        if (x, y, width, height) == (self._x, self._y, self._width, self._height):
+            return
+
+        self._x, self._y, self._width, self._height = x, y, width, height
+        self._updateInnerRect()
+
+    def _updateInnerRect(self):
+        bl, bt, br, bb = self._borders
+        self._innerRect = (self._x + bl, self._y + bt,
+                           self._x + self._width - br, self._y + self._height - bb)
+
+    def edgeAt(self, x, y):
+        """ Returns the edge class of the point
+
+        Parameters
+        ----------
+        x, y: int
+            point in the same coordinate system as the window rect passed to `setGeometry()`
+
+        Returns
+        -------
+        edge: ResizeEdge
+            edge class, `ResizeEdge.NONE` if no edge is hit
+        """
+        x0, y0, x1, y1 = self._innerRect
+        if x0 <= x < x1 and y0 <= y < y1:
+            return ResizeEdge.NONE
+
+        x -= self._x
+        y -= self._y
+        w, h = self._width, self._height
+        bl, bt, br, bb = self._borders
+        cl, ct, cr, cb = self._corners
+
+        left = x < bl
+        right = x >= w - br
+        top = y < bt
+        bottom = y >= h - bb
+
+        # extend the edge to the corner zone
+        if left or right:
+            top = top or y < ct
+            bottom = bottom or y >= h - cb
+        if top or bottom:
+            left = left or x < cl
+            right = right or x >= w - cr
+
+        return _EDGE_TABLE[left | right << 1 | top << 2 | bottom << 3]
+
+    def edgesAt(self, points):
+        """ Returns the edge classes of a batch of points, NumPy is required
+
+        Parameters
+        ----------
+        points: array_like
+            points with shape `(n, 2)`
+
+        Returns
+        -------
+        edges: `numpy.ndarray`
+            edge classes with shape `(n, )` and dtype `uint8`
+        """
+        import numpy as np
+
+        points = np.asarray(points)
+        x = points[:, 0] - self._x
+        y = points[:, 1] - self._y
+        w, h = self._width, self._height
+        bl, bt, br, bb = self._borders
+        cl, ct, cr, cb = self._corners
+
+        left = x < bl
+        right = x >= w - br
+        top = y < bt
+        bottom = y >= h - bb
+
+        side = left | right
+        top |= side & (y < ct)
+        bottom |= side & (y >= h - cb)
+
+        end = top | bottom
+        left |= end & (x < cl)
+        right |= end & (x >= w - cr)
+
+        mask = left.astype(np.uint8) | right << 1 | top << 2 | bottom << 3
+        return np.asarray(_EDGE_TABLE, dtype=np.uint8)[mask]
@@ -1,15 +1,16 @@
 # coding: utf-8
+import struct
+from collections import deque
 from enum import Enum
+from importlib.util import find_spec
 
-import xcffib as xcb
 from PyQt5 import sip
-from PyQt5.QtCore import QPointF, Qt, QEvent, QPoint, QObject
-from PyQt5.QtGui import QMouseEvent, QColor
+from PyQt5.QtCore import (QCoreApplication, QPointF, Qt, QEvent, QPoint, QObject,
+                          QSocketNotifier, QTimer, pyqtSignal)
+from PyQt5.QtGui import QMouseEvent, QColor, QGuiApplication
 from PyQt5.QtWidgets import QWidget, QApplication
-from PyQt5.QtX11Extras import QX11Info
-from xcffib.xproto import (ButtonIndex, ButtonMask, ButtonReleaseEvent,
-                           ClientMessageData, ClientMessageEvent, EventMask,
-                           xprotoExtension)
+
+from .move_resize import MoveResizeBackend
 
 
 class WindowMessage(Enum):
@@ -29,13 +30,551 @@ class WindowMessage(Enum):
     _NET_WM_MOVERESIZE_CANCEL = 11
 
 
-class LinuxMoveResize:
+class X11Reply(QObject):
+    """ Pending reply of an X11 request """
+
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(Exception)
+
+    def __init__(self, cookie, pipeline):
+        super().__init__()
+        self.cookie = cookie
+        self.pipeline = pipeline
+        self._isFinished = False
+        self._result = None
+        self._error = None
+
+    def isFinished(self):
+        """ whether the reply is received """
+        return self._isFinished
+
+    def result(self):
+        """ Returns the reply, it blocks until the reply is received """
+        if not self._isFinished:
+            self.pipeline.wait(self)
+
+        if self._error is not None:
+            raise self._error
+
+        return self._result
+
+    def then(self, callback):
+        """ call `callback(reply)` once the reply is received """
+        if self._isFinished:
+            if self._error is None:
+                callback(self._result)
+        else:
+            self.finished.connect(callback)
+
+    def _finish(self, result=None, error=None):
+        self._isFinished = True
+        self._result = result
+        self._error = error
+        if error is None:
+            self.finished.emit(result)
+        else:
+            self.failed.emit(error)
+
+    def asFuture(self, loop=None):
+        """ Returns an `asyncio.Future` which is done once the reply is received
+
+        Parameters
+        ----------
+        loop: `asyncio.AbstractEventLoop`
+            the event loop of future, it must be driven by the Qt event loop or
+            run in another thread. The running event loop is used by default
+        """
+        import asyncio
+
+        loop = loop or asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def setResult(result):
+            if not future.done():
+                future.set_result(result)
+
+        def setError(error):
+            if not future.done():
+                future.set_exception(error)
+
+        if self._isFinished:
+            setResult(self._result) if self._error is None else setError(self._error)
+        else:
+            self.finished.connect(lambda r: loop.call_soon_threadsafe(setResult, r))
+            self.failed.connect(lambda e: loop.call_soon_threadsafe(setError, e))
+
+        return future
+
+    def __await__(self):
+        import asyncio
+
+        return self.asFuture(asyncio.get_running_loop()).__await__()
+
+
+class X11RequestPipeline(QObject):
+    """ Non-blocking X11 request pipeline integrated with the Qt event loop
+
+    Replies are polled when the xcb socket becomes readable. Qt reads the same
+    socket in its own event reader, which may queue our replies inside xcb
+    without waking the notifier, so a coarse timer also polls while any request
+    is pending. Nothing runs when the pipeline is idle.
+    """
+
+    POLL_INTERVAL = 4
+
+    def __init__(self, connection, parent=None):
+        super().__init__(parent=parent)
+        self.connection = connection
+        self._pending = deque()
+        import xcffib as xcb
+
+        self._xcb = xcb
+        self._free = getattr(xcb, "c_free", None) or xcb.lib.free
+
+        self._notifier = QSocketNotifier(
+            connection.get_file_descriptor(), QSocketNotifier.Read, self)
+        self._notifier.setEnabled(False)
+        self._notifier.activated.connect(self._poll)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.POLL_INTERVAL)
+        self._timer.timeout.connect(self._poll)
+
+    def submit(self, cookie, flush=True):
+        """ submit the cookie of a request whose reply is delivered asynchronously
+
+        Parameters
+        ----------
+        cookie: `xcffib.Cookie`
+            cookie returned by the request
+
+        flush: bool
+            whether to flush the request to X server immediately
+
+        Returns
+        -------
+        reply: X11Reply
+            pending reply
+        """
+        reply = X11Reply(cookie, self)
+        self._pending.append(reply)
+        if flush:
+            self.connection.flush()
+
+        if not self._timer.isActive():
+            self._notifier.setEnabled(True)
+            self._timer.start()
+
+        return reply
+
+    def pendingCount(self):
+        """ Returns the number of pending requests """
+        return len(self._pending)
+
+    def wait(self, reply: X11Reply):
+        """ wait for the reply of request, the replies before it are delivered too """
+        while self._pending:
+            pending = self._pending[0]
+            if not self._take(pending, True):
+                break
+
+            self._pending.popleft()
+            if pending is reply:
+                break
+
+        self._updatePolling()
+
+    def _poll(self):
+        """ deliver all the received replies in request order """
+        while self._pending and self._take(self._pending[0], False):
+            self._pending.popleft()
+
+        self._updatePolling()
+
+    def _updatePolling(self):
+        if self._pending:
+            return
+
+        self._notifier.setEnabled(False)
+        self._timer.stop()
+
+    def _take(self, reply: X11Reply, block: bool):
+        """ take the reply from xcb, returns `False` if it is not received yet """
+        isReceived, result, error = self._receive(reply.cookie, block)
+        if not isReceived:
+            return False
+
+        reply._finish(result, error)
+        return True
+
+    def _receive(self, cookie, block: bool):
+        """ receive the reply of cookie from xcb, which is the only place using the internals of xcffib
+
+        Returns
+        -------
+        isReceived: bool
+            whether the reply or error is received
+
+        result: object
+            the unpacked reply, `None` if there is an error
+
+        error: Exception
+            the error of request, `None` if there is no error
+        """
+        xcb = self._xcb
+        lib, ffi = xcb.lib, xcb.ffi
+        conn = self.connection._conn
+        sequence = cookie.sequence
+        errorPointer = ffi.new("xcb_generic_error_t **")
+
+        if block:
+            data = lib.xcb_wait_for_reply(conn, sequence, errorPointer)
+        else:
+            dataPointer = ffi.new("void **")
+            if not lib.xcb_poll_for_reply(conn, sequence, dataPointer, errorPointer):
+                return False, None, None
+
+            data = dataPointer[0]
+
+        error = None
+        try:
+            self.connection._process_error(errorPointer[0])
+        except Exception as e:
+            error = e
+        finally:
+            if errorPointer[0] != ffi.NULL:
+                self._free(errorPointer[0])
+
+        if error is not None or data == ffi.NULL:
+            return True, None, error or xcb.XcffibException("No reply for sequence %d" % sequence)
+
+        data = ffi.gc(data, self._free)
+        length = ffi.cast("xcb_generic_reply_t *", data).length
+        unpacker = xcb.CffiUnpacker(data, known_max=32 + length * 4)
+        return True, cookie.reply_type(unpacker), None
+
+
+class X11AtomRegistry:
+    """ Registry of the atoms used by the library
+
+    All the unknown atoms are interned in one pipelined batch, so the round trip
+    to X server is paid once instead of once per atom.
+    """
+
+    names = ["_NET_WM_MOVERESIZE", "_NET_WM_STATE", "_NET_WM_STATE_ABOVE", "_KDE_NET_WM_BLUR_BEHIND_REGION",
+             "_NET_WM_OPAQUE_REGION", "_NET_WM_BYPASS_COMPOSITOR",
+             "_NET_WM_SYNC_REQUEST_COUNTER", "_GTK_FRAME_EXTENTS"]
+
+    def __init__(self, xproto, requests):
+        self.xproto = xproto
+        self.requests = requests
+        self._atoms = {}
+        self._replies = {}
+
+    @classmethod
+    def register(cls, *names):
+        """ register the names of atoms to be prefetched """
+        for name in names:
+            if name not in cls.names:
+                cls.names.append(name)
+
+    def isPrefetched(self):
+        """ whether all the registered atoms are interned or being interned """
+        return all(i in self._atoms or i in self._replies for i in self.names)
+
+    def prefetch(self, names=None):
+        """ intern atoms in one batch without blocking, the replies are collected by the request pipeline
+
+        Parameters
+        ----------
+        names: Iterable[str]
+            names of atoms, all the registered atoms are used if it's `None`
+        """
+        names = [i for i in (self.names if names is None else names)
+                 if i not in self._atoms and i not in self._replies]
+
+        for name in names:
+            cookie = self.xproto.InternAtom(False, len(name), name)
+            reply = self.requests.submit(cookie, False)
+            reply.then(lambda r, name=name: self._onAtomReceived(name, r))
+            reply.failed.connect(lambda e, name=name: self._onAtomFailed(name))
+            self._replies[name] = reply
+
+        if names:
+            self.requests.connection.flush()
+
+    def _onAtomReceived(self, name, reply):
+        self._atoms[name] = reply.atom
+        self._replies.pop(name, None)
+
+    def _onAtomFailed(self, name):
+        # the atom is interned again the next time it's requested
+        self._replies.pop(name, None)
+
+    def request(self, name: str):
+        """ Returns the pending reply of interning the atom, `None` if the atom has been received """
+        if name in self._atoms:
+            return None
+
+        if name not in self._replies:
+            self.prefetch([name])
+
+        return self._replies[name]
+
+    def get(self, name: str):
+        """ Returns the atom of name, it blocks only if the atom has not been received """
+        atom = self._atoms.get(name)
+        if atom is not None:
+            return atom
+
+        if name not in self._replies:
+            self.prefetch([name])
+
+        self._replies[name].result()
+        return self._atoms[name]
+
+
+class X11Context:
+    """ Process-wide context which shares the X server connection of Qt """
+
+    _instance = None
+
+    def __init__(self, connection=None, xproto=None, rootWindow=None):
+        """
+        Parameters
+        ----------
+        connection: `xcffib.Connection`
+            X server connection, the connection of Qt is used if it's `None`
+
+        xproto: `xcffib.xproto.xprotoExtension`
+            core protocol of connection, created from the connection if it's `None`
+
+        rootWindow: int
+            root window id, the root window of Qt application screen is used if it's `None`
+        """
+        if connection is None or rootWindow is None:
+            import xcffib as xcb
+            from PyQt5.QtX11Extras import QX11Info
+
+            # Qt owns the connection, so it must not be disconnected here
+            if connection is None:
+                connection = xcb.wrap(sip.unwrapinstance(QX11Info.connection()))
+
+            if rootWindow is None:
+                rootWindow = QX11Info.appRootWindow(QX11Info.appScreen())
+
+        if xproto is None:
+            from xcffib.xproto import xprotoExtension
+            xproto = xprotoExtension(connection)
+
+        self.connection = connection
+        self.xproto = xproto
+        self.rootWindow = rootWindow
+        self.requests = X11RequestPipeline(self.connection, QCoreApplication.instance())
+        self.atoms = X11AtomRegistry(self.xproto, self.requests)
+
+        # property writes are coalesced and sent once per event loop turn
+        self.propertyWriteCount = 0
+        self._pendingProperties = {}
+        self._propertyTimer = QTimer(QCoreApplication.instance())
+        self._propertyTimer.setSingleShot(True)
+        self._propertyTimer.setInterval(0)
+        self._propertyTimer.timeout.connect(self.flushProperties)
+
+    @classmethod
+    def instance(cls):
+        """ Returns the X11 context, create it if necessary """
+        if cls._instance is None:
+            cls._instance = cls()
+
+        return cls._instance
+
+    def atom(self, name: str):
+        """ Returns the atom of name """
+        return self.atoms.get(name)
+
+    def sendClientMessage(self, windowId: int, name: str, data):
+        """ send a 32-bit client message about the window to the window manager
+
+        Parameters
+        ----------
+        windowId: int
+            native window id
+
+        name: str
+            message type
+
+        data: List[int]
+            message data, at most 5 items
+        """
+        from xcffib.xproto import ClientMessageData, ClientMessageEvent, EventMask
+
+        union = ClientMessageData.synthetic(list(data) + [0] * (5 - len(data)), "I"*5)
+        event = ClientMessageEvent.synthetic(
+            format=32,
+            window=windowId,
+            type=self.atom(name),
+            data=union
+        )
+        self.xproto.SendEvent(
+            False,
+            self.rootWindow,
+            EventMask.SubstructureRedirect | EventMask.SubstructureNotify,
+            event.pack()
+        )
+
+    def setNetWmState(self, windowId: int, isEnabled: bool, *states: str):
+        """ add or remove the `_NET_WM_STATE` of a mapped window and flush the request
+
+        Parameters
+        ----------
+        windowId: int
+            native window id
+
+        isEnabled: bool
+            whether to add or remove the states
+
+        states: str
+            at most two state names, e.g. `_NET_WM_STATE_ABOVE`
+        """
+        # refer to: https://specifications.freedesktop.org/wm-spec/1.3/ar01s05.html#idm46201142872688
+        atoms = [self.atom(i) for i in states]
+        atoms += [0] * (2 - len(atoms))
+        self.sendClientMessage(windowId, "_NET_WM_STATE", [int(isEnabled), *atoms, 1])
+        self.flush()
+
+    def getProperty(self, windowId: int, name: str, type=0, length=1024):
+        """ read the property of window without blocking
+
+        Parameters
+        ----------
+        windowId: int
+            native window id
+
+        name: str
+            property name
+
+        type: int
+            property type, `AnyPropertyType` by default
+
+        length: int
+            the maximum length of the data to read, in 32-bit units
+
+        Returns
+        -------
+        reply: X11Reply
+            pending reply of `GetProperty`
+        """
+        pending = self.atoms.request(name)
+        if pending is None:
+            cookie = self.xproto.GetProperty(False, windowId, self.atom(name), type, 0, length)
+            return self.requests.submit(cookie)
+
+        # chain on the reply of atom instead of blocking on it
+        reply = X11Reply(None, self.requests)
+        pending.failed.connect(lambda e: reply._finish(error=e))
+        pending.then(lambda r: self._chainReply(
+            self.requests.submit(self.xproto.GetProperty(False, windowId, r.atom, type, 0, length)), reply))
+        return reply
+
+    @staticmethod
+    def _chainReply(source: X11Reply, target: X11Reply):
+        """ finish the target reply with the result of source reply """
+        source.finished.connect(lambda r: target._finish(r))
+        source.failed.connect(lambda e: target._finish(error=e))
+
+    def setProperty(self, windowId: int, name: str, type: int, data, format=32):
+        """ replace the property of window, the write is deferred to the end of event loop turn
+        and only the last value is written if the property is changed several times
+
+        Parameters
+        ----------
+        windowId: int
+            native window id
+
+        name: str
+            property name
+
+        type: int
+            property type, e.g. `xcffib.xproto.Atom.CARDINAL`
+
+        data: List[int]
+            property data
+
+        format: int
+            the bit width of each item, 8, 16 or 32
+        """
+        self._pendingProperties[(windowId, name)] = (type, format, list(data))
+        if not self._propertyTimer.isActive():
+            self._propertyTimer.start()
+
+    def deleteProperty(self, windowId: int, name: str):
+        """ delete the property of window, the request is deferred like `setProperty()` """
+        self._pendingProperties[(windowId, name)] = None
+        if not self._propertyTimer.isActive():
+            self._propertyTimer.start()
+
+    def _dropProperties(self, name):
+        """ drop the pending writes of the property whose atom can't be interned """
+        for key in [i for i in self._pendingProperties if i[1] == name]:
+            del self._pendingProperties[key]
+
+    def flushProperties(self):
+        """ write the pending properties to X server immediately """
+        from xcffib.xproto import PropMode
+
+        self._propertyTimer.stop()
+        if not self._pendingProperties:
+            return
+
+        # the properties whose atoms are being interned are written once the atoms are received
+        properties, self._pendingProperties = self._pendingProperties, {}
+        for key in list(properties):
+            pending = self.atoms.request(key[1])
+            if pending is not None:
+                self._pendingProperties[key] = properties.pop(key)
+                pending.then(lambda r: self._propertyTimer.start())
+                pending.failed.connect(lambda e, name=key[1]: self._dropProperties(name))
+
+        for (windowId, name), value in properties.items():
+            if value is None:
+                self.xproto.DeleteProperty(windowId, self.atom(name))
+                continue
+
+            type, format, data = value
+            code = {8: "B", 16: "H", 32: "I"}[format]
+            buffer = struct.pack(f"={len(data)}{code}", *data)
+            self.xproto.ChangeProperty(PropMode.Replace, windowId, self.atom(name), type, format, len(data), buffer)
+
+        if properties:
+            self.propertyWriteCount += len(properties)
+            self.flush()
+
+    def flush(self):
+        """ flush the pending requests to X server """
+        self.connection.flush()
+
+
+class LinuxMoveResize(MoveResizeBackend):
     """ Tool class for moving and resizing window """
 
-    moveResizeAtom = None
+    edgeMessages = {
+        Qt.TopEdge: WindowMessage._NET_WM_MOVERESIZE_SIZE_TOP.value,
+        Qt.TopEdge | Qt.LeftEdge: WindowMessage._NET_WM_MOVERESIZE_SIZE_TOPLEFT.value,
+        Qt.TopEdge | Qt.RightEdge: WindowMessage._NET_WM_MOVERESIZE_SIZE_TOPRIGHT.value,
+        Qt.BottomEdge: WindowMessage._NET_WM_MOVERESIZE_SIZE_BOTTOM.value,
+        Qt.BottomEdge | Qt.LeftEdge: WindowMessage._NET_WM_MOVERESIZE_SIZE_BOTTOMLEFT.value,
+        Qt.BottomEdge | Qt.RightEdge: WindowMessage._NET_WM_MOVERESIZE_SIZE_BOTTOMRIGHT.value,
+        Qt.LeftEdge: WindowMessage._NET_WM_MOVERESIZE_SIZE_LEFT.value,
+        Qt.RightEdge: WindowMessage._NET_WM_MOVERESIZE_SIZE_RIGHT.value,
+    }
+
+    @classmethod
+    def isAvailable(cls):
+        return isPlatformX11() and find_spec("xcffib") is not None
 
     @classmethod
-    def sendButtonReleaseEvent(cls, window, globalPos):
+    def sendButtonReleaseEvent(cls, window, globalPos, flush=True):
         """ send button release event
 
         Parameters
@@ -45,21 +584,24 @@ class LinuxMoveResize:
 
         globalPos: QPoint
             the global point of mouse release event
+
+        flush: bool
+            whether to flush the request to X server immediately
         """
+        import xcffib as xcb
+        from xcffib.xproto import ButtonIndex, ButtonMask, ButtonReleaseEvent, EventMask
+
+        context = X11Context.instance()
         globalPos = QPointF(QPointF(globalPos) *
                             window.devicePixelRatio()).toPoint()
         pos = window.mapFromGlobal(globalPos)
-
-        # open the connection to X server
-        conn = xcb.wrap(sip.unwrapinstance(QX11Info.connection()))
         windowId = int(window.winId())
-        xproto = xprotoExtension(conn)
 
         # refer to: https://www.x.org/releases/X11R7.5/doc/libxcb/tutorial/
         event = ButtonReleaseEvent.synthetic(
             detail=ButtonIndex._1,
             time=xcb.CurrentTime,
-            root=QX11Info.appRootWindow(QX11Info.appScreen()),
+            root=context.rootWindow,
             event=windowId,
             child=xcb.NONE,
             root_x=globalPos.x(),
@@ -69,8 +611,10 @@ class LinuxMoveResize:
             state=ButtonMask._1,
             same_screen=True,
         )
-        xproto.SendEvent(True, windowId, EventMask.ButtonRelease, event.pack())
-        conn.flush()
+        context.xproto.SendEvent(True, windowId, EventMask.ButtonRelease, event.pack())
+
+        if flush:
+            context.flush()
 
     @classmethod
     def startSystemMoveResize(cls, window, globalPos, message):
@@ -87,45 +631,30 @@ class LinuxMoveResize:
         message: int
             window message
         """
-        cls.sendButtonReleaseEvent(window, globalPos)
+        import xcffib as xcb
+        from xcffib.xproto import ButtonIndex
+
+        # the release event and the move resize message share one flush
+        cls.sendButtonReleaseEvent(window, globalPos, False)
 
+        context = X11Context.instance()
         globalPos = QPointF(QPointF(globalPos) *
                             window.devicePixelRatio()).toPoint()
 
-        # open the connection to X server
-        conn = xcb.wrap(sip.unwrapinstance(QX11Info.connection()))
-        xproto = xprotoExtension(conn)
-
-        if not cls.moveResizeAtom:
-            cls.moveResizeAtom = xproto.InternAtom(
-                False, len("_NET_WM_MOVERESIZE"), "_NET_WM_MOVERESIZE").reply().atom
-
-        union = ClientMessageData.synthetic([
+        context.xproto.UngrabPointer(xcb.CurrentTime)
+        context.sendClientMessage(int(window.winId()), "_NET_WM_MOVERESIZE", [
             globalPos.x(),
             globalPos.y(),
             message,
             ButtonIndex._1,
             0
-        ], "I"*5)
-        event = ClientMessageEvent.synthetic(
-            format=32,
-            window=int(window.winId()),
-            type=cls.moveResizeAtom,
-            data=union
-        )
-        xproto.UngrabPointer(xcb.CurrentTime)
-        xproto.SendEvent(
-            False,
-            QX11Info.appRootWindow(QX11Info.appScreen()),
-            EventMask.SubstructureRedirect | EventMask.SubstructureNotify,
-            event.pack()
-        )
-        conn.flush()
+        ])
+        context.flush()
 
     @classmethod
     def startSystemMove(cls, window, globalPos):
         """ move window """
-        if QX11Info.isPlatformX11():
+        if isPlatformX11():
             cls.startSystemMoveResize(
                 window, globalPos, WindowMessage._NET_WM_MOVERESIZE_MOVE.value)
         else:
@@ -152,22 +681,17 @@ class LinuxMoveResize:
         if not edges:
             return
 
-        if QX11Info.isPlatformX11():
-            messageMap = {
-                Qt.TopEdge: WindowMessage._NET_WM_MOVERESIZE_SIZE_TOP,
-                Qt.TopEdge | Qt.LeftEdge: WindowMessage._NET_WM_MOVERESIZE_SIZE_TOPLEFT,
-                Qt.TopEdge | Qt.RightEdge: WindowMessage._NET_WM_MOVERESIZE_SIZE_TOPRIGHT,
-                Qt.BottomEdge: WindowMessage._NET_WM_MOVERESIZE_SIZE_BOTTOM,
-                Qt.BottomEdge | Qt.LeftEdge: WindowMessage._NET_WM_MOVERESIZE_SIZE_BOTTOMLEFT,
-                Qt.BottomEdge | Qt.RightEdge: WindowMessage._NET_WM_MOVERESIZE_SIZE_BOTTOMRIGHT,
-                Qt.LeftEdge: WindowMessage._NET_WM_MOVERESIZE_SIZE_LEFT,
-                Qt.RightEdge: WindowMessage._NET_WM_MOVERESIZE_SIZE_RIGHT,
-            }
-            cls.startSystemMoveResize(window, globalPos, messageMap[edges].value)
+        if isPlatformX11():
+            cls.startSystemMoveResize(window, globalPos, cls.edgeMessages[edges])
         else:
             window.windowHandle().startSystemResize(edges)
 
 
+def isPlatformX11():
+    """ whether the application is running on X11 """
+    return QGuiApplication.platformName() == "xcb"
+
+
 def getSystemAccentColor():
     """ get the accent color of system
 
@@ -9,10 +9,12 @@ from PyQt5.QtWidgets import QWidget
 from Quartz.CoreGraphics import (CGEventCreateMouseEvent,
                                  kCGEventLeftMouseDown, kCGMouseButtonLeft)
 
+from .move_resize import MoveResizeBackend
+
 QT_VERSION = tuple(int(v) for v in QT_VERSION_STR.split('.'))
 
 
-class MacMoveResize:
+class MacMoveResize(MoveResizeBackend):
     """ Tool class for moving and resizing Mac OS window """
 
     @staticmethod
@@ -0,0 +1,164 @@
+# coding:utf-8
+import os
+import warnings
+from abc import ABC, abstractmethod
+
+from PyQt5.QtCore import QT_VERSION_STR, QEvent, QPoint, Qt
+from PyQt5.QtGui import QMouseEvent
+from PyQt5.QtWidgets import QApplication
+
+QT_VERSION = tuple(int(v) for v in QT_VERSION_STR.split('.'))
+
+# environment variable used to override the probed backend
+MOVE_RESIZE_BACKEND_ENV = "QFRAMELESSWINDOW_MOVE_RESIZE_BACKEND"
+
+
+class MoveResizeBackend(ABC):
+    """ Base class of the backend which moves and resizes window """
+
+    # whether the backend can be selected by the capability probe
+    isAutoSelectable = True
+
+    @classmethod
+    def isAvailable(cls):
+        """ whether the backend works on the current platform """
+        return True
+
+    @classmethod
+    @abstractmethod
+    def startSystemMove(cls, window, globalPos):
+        """ move window
+
+        Parameters
+        ----------
+        window: QWidget
+            window
+
+        globalPos: QPoint
+            the global point of mouse release event
+        """
+
+    @classmethod
+    @abstractmethod
+    def starSystemResize(cls, window, globalPos, edges):
+        """ resize window
+
+        Parameters
+        ----------
+        window: QWidget
+            window
+
+        globalPos: QPoint
+            the global point of mouse release event
+
+        edges: `Qt.Edges`
+            window edges
+        """
+
+
+class QtNativeMoveResize(MoveResizeBackend):
+    """ Backend using `QWindow.startSystemMove()` and `QWindow.startSystemResize()` """
+
+    @classmethod
+    def isAvailable(cls):
+        return QT_VERSION >= (5, 15, 0)
+
+    @classmethod
+    def startSystemMove(cls, window, globalPos):
+        window.windowHandle().startSystemMove()
+
+        # the release event is grabbed by window manager
+        event = QMouseEvent(QEvent.MouseButtonRelease, QPoint(-1, -1),
+                            Qt.LeftButton, Qt.NoButton, Qt.NoModifier)
+        QApplication.instance().postEvent(window.windowHandle(), event)
+
+    @classmethod
+    def starSystemResize(cls, window, globalPos, edges):
+        if edges:
+            window.windowHandle().startSystemResize(edges)
+
+
+class RecordingMoveResize(MoveResizeBackend):
+    """ Fake backend which only records the requests, useful for testing and benchmark """
+
+    isAutoSelectable = False
+    calls = []
+
+    @classmethod
+    def startSystemMove(cls, window, globalPos):
+        cls.calls.append(("move", window, QPoint(globalPos), Qt.Edges()))
+
+    @classmethod
+    def starSystemResize(cls, window, globalPos, edges):
+        if edges:
+            cls.calls.append(("resize", window, QPoint(globalPos), edges))
+
+    @classmethod
+    def clear(cls):
+        """ clear the recorded requests """
+        cls.calls.clear()
+
+
+class MoveResizeBackendRegistry:
+    """ Registry of move and resize backends """
+
+    _backends = {}
+    _current = None
+
+    @classmethod
+    def register(cls, name: str, backend):
+        """ register backend, the backends registered earlier are preferred by the probe
+
+        Parameters
+        ----------
+        name: str
+            the name of backend
+
+        backend: MoveResizeBackend
+            backend class
+        """
+        cls._backends[name] = backend
+
+    @classmethod
+    def backends(cls):
+        """ Returns the names of registered backends """
+        return list(cls._backends.keys())
+
+    @classmethod
+    def setCurrent(cls, name: str):
+        """ set the backend in use, `None` means probing it again """
+        if name is not None and name not in cls._backends:
+            raise ValueError(f"`{name}` is not a registered move resize backend")
+
+        cls._current = None if name is None else (name, cls._backends[name])
+
+    @classmethod
+    def currentName(cls):
+        """ Returns the name of backend in use """
+        return cls._probe()[0]
+
+    @classmethod
+    def current(cls):
+        """ Returns the backend in use """
+        return cls._probe()[1]
+
+    @classmethod
+    def _probe(cls):
+        if cls._current:
+            return cls._current
+
+        name = os.environ.get(MOVE_RESIZE_BACKEND_ENV)
+        if name in cls._backends:
+            cls._current = (name, cls._backends[name])
+            return cls._current
+
+        if name:
+            warnings.warn(f"`{name}` set by `{MOVE_RESIZE_BACKEND_ENV}` is not a registered move resize "
+                          f"backend, the available ones are {cls.backends()}")
+
+        for name, backend in cls._backends.items():
+            if backend.isAutoSelectable and backend.isAvailable():
+                cls._current = (name, backend)
+                return cls._current
+
+        raise RuntimeError("No available move resize backend")
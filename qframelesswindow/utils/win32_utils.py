@@ -15,6 +15,8 @@ from PyQt5.QtGui import QGuiApplication, QColor
 from PyQt5.QtWidgets import QWidget
 from win32comext.shell import shellcon
 
+from .move_resize import MoveResizeBackend
+
 
 def getSystemAccentColor():
     """ get the accent color of system
@@ -329,7 +331,7 @@ class Taskbar:
         return cls.NO_POSITION
 
 
-class WindowsMoveResize:
+class WindowsMoveResize(MoveResizeBackend):
     """ Tool class for moving and resizing Mac OS window """
 
     @staticmethod
@@ -11,12 +11,26 @@ from PyQt5.QtGui import QCloseEvent, QCursor
 from PyQt5.QtWidgets import QApplication, QWidget
 
 from ..titlebar import TitleBar
+from ..titlebar.drag_region import DragRegion
 from ..utils import win32_utils as win_utils
+from ..utils.hit_test import EdgeHitTest, ResizeEdge
 from ..utils.win32_utils import Taskbar, isSystemBorderAccentEnabled, getSystemAccentColor
 from .c_structures import LPNCCALCSIZE_PARAMS
 from .window_effect import WindowsWindowEffect
 
 
+HIT_TEST_RESULTS = {
+    ResizeEdge.LEFT: win32con.HTLEFT,
+    ResizeEdge.TOP: win32con.HTTOP,
+    ResizeEdge.RIGHT: win32con.HTRIGHT,
+    ResizeEdge.BOTTOM: win32con.HTBOTTOM,
+    ResizeEdge.TOP_LEFT: win32con.HTTOPLEFT,
+    ResizeEdge.TOP_RIGHT: win32con.HTTOPRIGHT,
+    ResizeEdge.BOTTOM_LEFT: win32con.HTBOTTOMLEFT,
+    ResizeEdge.BOTTOM_RIGHT: win32con.HTBOTTOMRIGHT,
+}
+
+
 class WindowsFramelessWindow(QWidget):
     """  Frameless window for Windows system """
 
@@ -28,6 +42,7 @@ class WindowsFramelessWindow(QWidget):
         self.titleBar = TitleBar(self)
         self._isSystemButtonVisible = False
         self._isResizeEnabled = True
+        self._edgeHitTest = EdgeHitTest(self.BORDER_WIDTH)
 
         self.updateFrameless()
 
@@ -123,35 +138,29 @@ class WindowsFramelessWindow(QWidget):
         if not msg.hWnd:
             return super().nativeEvent(eventType, message)
 
-        if msg.message == win32con.WM_NCHITTEST and self._isResizeEnabled:
-            xPos, yPos = win32gui.ScreenToClient(msg.hWnd, win32api.GetCursorPos())
-            clientRect = win32gui.GetClientRect(msg.hWnd)
-
-            w = clientRect[2] - clientRect[0]
-            h = clientRect[3] - clientRect[1]
-
-            # fixes issue https://github.com/zhiyiYo/PyQt-Frameless-Window/issues/98
-            bw = 0 if win_utils.isMaximized(msg.hWnd) or win_utils.isFullScreen(msg.hWnd) else self.BORDER_WIDTH
-            lx = xPos < bw  # left
-            rx = xPos > w - bw  # right
-            ty = yPos < bw  # top
-            by = yPos > h - bw  # bottom
-            if lx and ty:
-                return True, win32con.HTTOPLEFT
-            elif rx and by:
-                return True, win32con.HTBOTTOMRIGHT
-            elif rx and ty:
-                return True, win32con.HTTOPRIGHT
-            elif lx and by:
-                return True, win32con.HTBOTTOMLEFT
-            elif ty:
-                return True, win32con.HTTOP
-            elif by:
-                return True, win32con.HTBOTTOM
-            elif lx:
-                return True, win32con.HTLEFT
-            elif rx:
-                return True, win32con.HTRIGHT
+        if msg.message == win32con.WM_NCHITTEST:
+            if self._isResizeEnabled:
+                xPos, yPos = win32gui.ScreenToClient(msg.hWnd, win32api.GetCursorPos())
+                clientRect = win32gui.GetClientRect(msg.hWnd)
+
+                self._edgeHitTest.setGeometry(0, 0, clientRect[2] - clientRect[0], clientRect[3] - clientRect[1])
+
+                # fixes issue https://github.com/zhiyiYo/PyQt-Frameless-Window/issues/98
+                bw = 0 if win_utils.isMaximized(msg.hWnd) or win_utils.isFullScreen(msg.hWnd) else self.BORDER_WIDTH
+                if self._edgeHitTest.borderWidths()[0] != bw:
+                    self._edgeHitTest.setBorderWidths(bw, bw, bw, bw)
+                    self._edgeHitTest.setCornerWidths(bw, bw, bw, bw)
+
+                edge = self._edgeHitTest.edgeAt(xPos, yPos)
+                if edge != ResizeEdge.NONE:
+                    return True, HIT_TEST_RESULTS[edge]
+
+            # the registered drag regions of title bar are handled by system as caption
+            if self._isCaptionAt(QCursor.pos()):
+                return True, win32con.HTCAPTION
+        elif msg.message == win32con.WM_NCLBUTTONDBLCLK and msg.wParam == win32con.HTCAPTION:
+            if not self.titleBar._isDoubleClickEnabled:
+                return True, 0
         elif msg.message == win32con.WM_NCCALCSIZE:
             if msg.wParam:
                 rect = cast(msg.lParam, LPNCCALCSIZE_PARAMS).contents.rgrc[0]
@@ -192,6 +201,14 @@ class WindowsFramelessWindow(QWidget):
 
         return super().nativeEvent(eventType, message)
 
+    def _isCaptionAt(self, globalPos):
+        """ whether the global position is in the registered drag region of title bar """
+        if not self.titleBar.isVisible():
+            return False
+
+        pos = self.titleBar.mapFromGlobal(globalPos)
+        return self.titleBar.dragRegionAt(pos) == DragRegion.DRAG and not self.titleBar._hasButtonPressed()
+
     def __onScreenChanged(self):
         hWnd = int(self.windowHandle().winId())
         win32gui.SetWindowPos(hWnd, None, 0, 0, 0, 0, win32con.SWP_NOMOVE |
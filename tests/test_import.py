@@ -0,0 +1,42 @@
+# coding:utf-8
+""" Import budget of the package, each case runs in a fresh interpreter """
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# the modules which are only imported when the features using them are used
+HEAVY_MODULES = ["PyQt5.QtSvg", "PyQt5.QtXml", "xcffib"]
+
+
+def runPython(code):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], env=env, capture_output=True, text=True, timeout=60)
+    assert process.returncode == 0, process.stderr
+    return process
+
+
+def importedModules(stderr):
+    """ Returns the modules listed by `-X importtime` """
+    return {line.rsplit("|", 1)[-1].strip() for line in stderr.splitlines() if line.startswith("import time:")}
+
+
+def test_package_import_is_lazy():
+    modules = importedModules(runPython("import qframelesswindow").stderr)
+
+    assert "qframelesswindow" in modules
+    assert not any(i.startswith("qframelesswindow.") for i in modules)
+    assert "PyQt5.QtWidgets" not in modules
+
+
+def test_window_import_skips_heavy_modules():
+    process = runPython(
+        "import sys\n"
+        "from qframelesswindow import FramelessWindow\n"
+        f"print([i for i in {HEAVY_MODULES!r} if i in sys.modules])"
+    )
+
+    assert process.stdout.strip() == "[]"
+    assert not importedModules(process.stderr) & set(HEAVY_MODULES)
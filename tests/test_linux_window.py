@@ -0,0 +1,54 @@
+# coding:utf-8
+""" Tests of the X11 state of Linux frameless window, the property writes are recorded instead of sent """
+import sys
+
+import pytest
+
+pytestmark = pytest.mark.skipif(sys.platform != "linux", reason="Linux only")
+
+
+class RecordingContext:
+    """ X11 context which records the properties written to windows """
+
+    def __init__(self):
+        self.properties = {}
+
+    def setProperty(self, windowId, name, type, data):
+        self.properties[(windowId, name)] = list(data)
+
+    def deleteProperty(self, windowId, name):
+        self.properties.pop((windowId, name), None)
+
+
+@pytest.fixture
+def context(qapp, monkeypatch):
+    import qframelesswindow.linux.window_effect as window_effect
+
+    context = RecordingContext()
+    monkeypatch.setattr(window_effect, "isPlatformX11", lambda: True)
+    monkeypatch.setattr(window_effect.X11Context, "instance", classmethod(lambda cls: context))
+    return context
+
+
+def test_blur_region_follows_recreated_window(qapp, context):
+    from qframelesswindow import FramelessWindow
+
+    window = FramelessWindow()
+    window.resize(300, 200)
+    effect = window.windowEffect
+    effect.enableBlurBehindWindow(window.winId())
+    oldId = int(window.winId())
+    assert (oldId, "_KDE_NET_WM_BLUR_BEHIND_REGION") in context.properties
+
+    # the shadow recreates the hidden native window to change its visual
+    effect.addShadowEffect(window.winId(), radius=10)
+    window.show()
+    qapp.processEvents()
+
+    windowId = int(window.winId())
+    assert windowId != oldId
+    assert context.properties[(windowId, "_KDE_NET_WM_BLUR_BEHIND_REGION")] == [10, 10, 280, 180]
+
+    effect.disableBlurBehindWindow(window.winId())
+    assert (windowId, "_KDE_NET_WM_BLUR_BEHIND_REGION") not in context.properties
+    window.close()
@@ -0,0 +1,28 @@
+# coding:utf-8
+import pytest
+
+from qframelesswindow.utils import MoveResizeBackendRegistry
+from qframelesswindow.utils.move_resize import MOVE_RESIZE_BACKEND_ENV, MoveResizeBackend
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(MoveResizeBackendRegistry, "_current", None)
+    return MoveResizeBackendRegistry
+
+
+def test_backend_methods_are_abstract():
+    assert MoveResizeBackend.__abstractmethods__ == {"startSystemMove", "starSystemResize"}
+
+
+def test_backend_is_chosen_by_environment(registry, monkeypatch):
+    monkeypatch.setenv(MOVE_RESIZE_BACKEND_ENV, "recording")
+    assert registry.currentName() == "recording"
+
+
+def test_unknown_backend_in_environment_warns(registry, monkeypatch):
+    monkeypatch.setenv(MOVE_RESIZE_BACKEND_ENV, "unknown")
+    with pytest.warns(UserWarning, match="unknown"):
+        name = registry.currentName()
+
+    assert name in registry.backends() and name != "unknown"
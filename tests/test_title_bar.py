@@ -0,0 +1,173 @@
+# coding:utf-8
+import sys
+import time
+
+from PyQt5.QtCore import QEvent, QPoint, Qt
+from PyQt5.QtGui import QMouseEvent
+
+import qframelesswindow.titlebar as titlebar
+from qframelesswindow import FramelessWindow
+from qframelesswindow.titlebar.tab_title_bar import TabTitleBar
+
+
+def test_hover_does_not_move_window(qapp, monkeypatch):
+    moves = []
+    monkeypatch.setattr(titlebar, "startSystemMove", lambda window, pos: moves.append(pos))
+    monkeypatch.setattr(sys, "platform", "win32")
+
+    window = FramelessWindow()
+    titleBar = TabTitleBar(window)
+    window.setTitleBar(titleBar)
+    window.show()
+    qapp.processEvents()
+
+    # the empty tab strip is draggable and tracked by mouse
+    pos = QPoint(window.width() - 200, 10)
+    assert titleBar.canDrag(pos)
+
+    qapp.sendEvent(titleBar, QMouseEvent(QEvent.MouseMove, pos, Qt.NoButton, Qt.NoButton, Qt.NoModifier))
+    assert not moves
+
+    qapp.sendEvent(titleBar, QMouseEvent(QEvent.MouseMove, pos, Qt.NoButton, Qt.LeftButton, Qt.NoModifier))
+    assert len(moves) == 1
+
+
+def test_button_colors_are_not_shared(qapp):
+    from qframelesswindow.titlebar.title_bar_buttons import (CLOSE_BUTTON_STYLE, CloseButton, MinimizeButton,
+                                                             TitleBarButtonStyle)
+    first, second = CloseButton(), CloseButton()
+    alpha = CLOSE_BUTTON_STYLE.hoverBackgroundColor.alpha()
+
+    color = first.getHoverBackgroundColor()
+    color.setAlpha(100)
+    first.setHoverBackgroundColor(color)
+
+    assert first.getHoverBackgroundColor().alpha() == 100
+    assert second.getHoverBackgroundColor().alpha() == alpha
+    assert CloseButton().getHoverBackgroundColor().alpha() == alpha
+    assert CLOSE_BUTTON_STYLE.hoverBackgroundColor.alpha() == alpha
+
+    # the default style is shared
+    assert MinimizeButton().buttonStyle() is MinimizeButton().buttonStyle() is TitleBarButtonStyle()
+
+
+def test_title_is_elided_with_label_font(qapp):
+    window = FramelessWindow()
+    window.setTitleBar(titlebar.StandardTitleBar(window))
+    titleBar = window.titleBar
+    window.resize(400, 300)
+    window.show()
+
+    title = "The quick brown fox jumps over the lazy dog"
+    window.setWindowTitle(title)
+    qapp.processEvents()
+    assert titleBar.titleLabel.text() != title
+
+    # the smaller font of user style sheet makes room for the whole title
+    titleBar.titleLabel.setStyleSheet("font: 8px")
+    qapp.processEvents()
+    assert titleBar.titleLabel.text() == title
+
+
+def test_button_animations_share_one_timer(qapp):
+    from PyQt5.QtCore import QTimer
+
+    from qframelesswindow.titlebar.animation import TitleBarAnimationTicker
+    from qframelesswindow.titlebar.title_bar_buttons import TitleBarButtonState
+
+    windows = []
+    for _ in range(10):
+        window = FramelessWindow()
+        window.titleBar.setButtonAnimationEnabled(True, 50)
+        window.show()
+        windows.append(window)
+
+    qapp.processEvents()
+    for window in windows:
+        window.titleBar.minBtn.setState(TitleBarButtonState.HOVER)
+        window.titleBar.closeBtn.setState(TitleBarButtonState.HOVER)
+
+    def activeTimers():
+        objects = [qapp] + windows
+        return [t for o in objects for t in o.findChildren(QTimer) if t.isActive()]
+
+    ticker = TitleBarAnimationTicker.instance()
+    assert activeTimers() == [ticker.timer]
+
+    # the timer is stopped once all the transitions are finished
+    end = time.monotonic() + 1
+    while ticker.isActive() and time.monotonic() < end:
+        qapp.processEvents()
+        time.sleep(0.001)
+
+    assert not activeTimers()
+    assert not any(w.titleBar.closeBtn._bgColorTransition.isRunning() for w in windows)
+
+    for window in windows:
+        window.close()
+
+
+def test_layout_spacing_is_applied_after_resize(qapp):
+    window = FramelessWindow()
+    window.show()
+    qapp.processEvents()
+
+    titleBar = window.titleBar
+    titleBar.hBoxLayout.insertSpacing(3, 40)
+    window.resize(window.width() + 100, window.height())
+    qapp.processEvents()
+
+    width = titleBar.width()
+    buttons = titleBar.minBtn.width() + titleBar.maxBtn.width() + titleBar.closeBtn.width()
+    assert titleBar.closeBtn.x() == width - titleBar.closeBtn.width()
+    assert titleBar.minBtn.x() == width - buttons - 40
+    window.close()
+
+
+def test_removed_drag_region_is_not_watched(qapp):
+    from PyQt5.QtWidgets import QWidget
+
+    window = FramelessWindow()
+    titleBar = window.titleBar
+    container = QWidget(titleBar)
+    region = QWidget(container)
+    window.show()
+
+    def connections(widget):
+        # the slot proxies of disconnected methods are deleted later
+        qapp.sendPostedEvents(None, QEvent.DeferredDelete)
+        return widget.receivers(widget.destroyed) - receivers
+
+    receivers = region.receivers(region.destroyed)
+
+    titleBar.addDragRegion(region)
+    connected = connections(region)
+    titleBar.removeDragRegion(region)
+    titleBar.addDragRegion(region)
+    titleBar.addNoDragRegion(region)
+    assert connections(region) == connected > 0
+
+    titleBar.addNoDragRegion(container)
+    titleBar.removeDragRegion(region)
+    assert connections(region) == 0
+
+    # the container is still watched for its own region
+    titleBar.dragRegionAt(QPoint(0, 0))
+    region.move(5, 5)
+    assert not titleBar._isDragRegionIndexDirty
+    container.move(5, 5)
+    assert titleBar._isDragRegionIndexDirty
+
+    titleBar.clearDragRegions()
+    titleBar._isDragRegionIndexDirty = False
+    container.move(10, 10)
+    assert not titleBar._isDragRegionIndexDirty
+    assert connections(container) == 0
+
+    # the buttons are still watched
+    titleBar.addDragRegion(titleBar.minBtn)
+    titleBar.removeDragRegion(titleBar.minBtn)
+    titleBar._buttonsWidth = 0
+    titleBar.minBtn.move(0, 0)
+    assert titleBar._buttonsWidth is None
+    window.close()
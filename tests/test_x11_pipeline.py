@@ -0,0 +1,316 @@
+# coding:utf-8
+""" Tests of the X11 request pipeline against a fake connection, the real connection is tested in `test_x11_xvfb.py` """
+import asyncio
+import os
+import struct
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("xcffib")
+
+from qframelesswindow.utils.linux_utils import X11Context, X11RequestPipeline  # noqa: E402
+
+CARDINAL = 6
+
+
+class FakeError(Exception):
+    """ Error of fake request """
+
+
+class FakeConnection:
+    """ Connection whose file descriptor never becomes readable, so the replies are polled by timer """
+
+    def __init__(self):
+        self.readFd, self.writeFd = os.pipe()
+        self.flushCount = 0
+
+    def get_file_descriptor(self):
+        return self.readFd
+
+    def flush(self):
+        self.flushCount += 1
+
+    def close(self):
+        os.close(self.readFd)
+        os.close(self.writeFd)
+
+
+class FakeXProto:
+    """ Core protocol which answers the requests with the fake server state """
+
+    def __init__(self):
+        self.sequence = 0
+        self.calls = []
+        self.atoms = {}
+        self.properties = {}
+        self.windows = {1, 2}
+        self.badAtoms = set()
+
+    def _cookie(self, *call):
+        self.sequence += 1
+        self.calls.append(call)
+        return SimpleNamespace(sequence=self.sequence, call=call)
+
+    def InternAtom(self, onlyIfExists, length, name):
+        return self._cookie("InternAtom", name)
+
+    def GetProperty(self, delete, window, property, type, offset, length):
+        return self._cookie("GetProperty", window, property)
+
+    def ChangeProperty(self, mode, window, property, type, format, length, data):
+        self.calls.append(("ChangeProperty", window, property))
+        self.properties[(window, property)] = struct.unpack(f"={length}I", data)
+
+    def DeleteProperty(self, window, property):
+        self.calls.append(("DeleteProperty", window, property))
+        self.properties.pop((window, property), None)
+
+    def answer(self, cookie):
+        """ Returns the `(result, error)` of request """
+        call = cookie.call
+        if call[0] == "InternAtom":
+            if call[1] in self.badAtoms:
+                return None, FakeError("BadAlloc")
+
+            atom = self.atoms.setdefault(call[1], 100 + len(self.atoms))
+            return SimpleNamespace(atom=atom), None
+
+        if call[1] not in self.windows:
+            return None, FakeError("BadWindow")
+
+        value = self.properties.get((call[1], call[2]), ())
+        return SimpleNamespace(value=value, value_len=len(value)), None
+
+
+class FakePipeline(X11RequestPipeline):
+    """ Pipeline whose replies arrive only when the test says so """
+
+    def __init__(self, connection, xproto, parent=None):
+        super().__init__(connection, parent)
+        self.xproto = xproto
+        self.arrived = set()
+        self.blockCount = 0
+
+    def arrive(self, *sequences):
+        self.arrived.update(sequences)
+
+    def arriveAll(self):
+        self.arrive(*range(1, self.xproto.sequence + 1))
+
+    def _receive(self, cookie, block):
+        if block:
+            self.blockCount += 1
+        elif cookie.sequence not in self.arrived:
+            return False, None, None
+
+        return (True, *self.xproto.answer(cookie))
+
+
+def waitUntil(app, condition, timeout=1000):
+    """ process events until the condition is met """
+    end = time.monotonic() + timeout / 1000
+    while not condition() and time.monotonic() < end:
+        app.processEvents()
+        time.sleep(0.001)
+
+    return condition()
+
+
+@pytest.fixture
+def pipeline(qapp):
+    connection = FakeConnection()
+    pipeline = FakePipeline(connection, FakeXProto())
+    yield pipeline
+    pipeline.deleteLater()
+    connection.close()
+
+
+@pytest.fixture
+def context(pipeline):
+    context = X11Context(pipeline.connection, pipeline.xproto, rootWindow=1)
+    context.requests = pipeline
+    context.atoms.requests = pipeline
+    return context
+
+
+def test_reply_is_delivered_by_polling(qapp, pipeline):
+    reply = pipeline.submit(pipeline.xproto.InternAtom(False, 4, "ATOM"))
+    results = []
+    reply.then(results.append)
+
+    assert not reply.isFinished()
+    assert pipeline.pendingCount() == 1
+
+    pipeline.arriveAll()
+    assert waitUntil(qapp, reply.isFinished)
+    assert results[0].atom == 100
+    assert pipeline.blockCount == 0
+
+
+def test_replies_are_delivered_in_request_order(qapp, pipeline):
+    xproto = pipeline.xproto
+    order = []
+    first = pipeline.submit(xproto.InternAtom(False, 1, "A"))
+    second = pipeline.submit(xproto.InternAtom(False, 1, "B"))
+    first.then(lambda r: order.append("A"))
+    second.then(lambda r: order.append("B"))
+
+    # the later reply is held back until the earlier one is received
+    pipeline.arrive(2)
+    waitUntil(qapp, second.isFinished, 50)
+    assert not first.isFinished() and not second.isFinished()
+
+    pipeline.arrive(1)
+    assert waitUntil(qapp, second.isFinished)
+    assert order == ["A", "B"]
+
+
+def test_wait_delivers_earlier_replies(qapp, pipeline):
+    xproto = pipeline.xproto
+    replies = [pipeline.submit(xproto.InternAtom(False, 1, i)) for i in "ABC"]
+
+    assert replies[1].result().atom == 101
+    assert [i.isFinished() for i in replies] == [True, True, False]
+    assert pipeline.pendingCount() == 1
+
+
+def test_error_reply(qapp, pipeline):
+    reply = pipeline.submit(pipeline.xproto.GetProperty(False, 404, 1, 0, 0, 1))
+    results, errors = [], []
+    reply.then(results.append)
+    reply.failed.connect(errors.append)
+
+    pipeline.arriveAll()
+    assert waitUntil(qapp, reply.isFinished)
+    assert not results
+    assert isinstance(errors[0], FakeError)
+
+    with pytest.raises(FakeError):
+        reply.result()
+
+
+def test_polling_stops_when_idle(qapp, pipeline):
+    reply = pipeline.submit(pipeline.xproto.InternAtom(False, 1, "A"))
+    assert pipeline._timer.isActive()
+
+    pipeline.arriveAll()
+    assert waitUntil(qapp, reply.isFinished)
+    assert not pipeline._timer.isActive()
+    assert not pipeline._notifier.isEnabled()
+
+
+def test_atoms_are_interned_in_one_batch(qapp, context):
+    connection = context.connection
+    context.atoms.prefetch(["A", "B", "C"])
+
+    assert [i[0] for i in context.xproto.calls] == ["InternAtom"] * 3
+    assert connection.flushCount == 1
+
+    context.requests.arriveAll()
+    assert waitUntil(qapp, lambda: context.atoms.request("C") is None)
+    assert context.atom("B") == 101
+    assert context.requests.blockCount == 0
+
+
+def test_get_property_does_not_block_on_atom(qapp, context):
+    pipeline, xproto = context.requests, context.xproto
+    reply = context.getProperty(1, "_NET_WM_OPAQUE_REGION", CARDINAL, 4)
+
+    # only the atom is requested until it's received
+    assert [i[0] for i in xproto.calls] == ["InternAtom"]
+    assert not reply.isFinished()
+
+    pipeline.arrive(1)
+    assert waitUntil(qapp, lambda: len(xproto.calls) == 2)
+    assert xproto.calls[1] == ("GetProperty", 1, 100)
+
+    pipeline.arrive(2)
+    assert waitUntil(qapp, reply.isFinished)
+    assert reply.result().value_len == 0
+    assert pipeline.blockCount == 0
+
+
+def test_get_property_error_is_chained(qapp, context):
+    reply = context.getProperty(404, "_NET_WM_OPAQUE_REGION")
+    errors = []
+    reply.failed.connect(errors.append)
+
+    context.requests.arrive(1, 2)
+    assert waitUntil(qapp, reply.isFinished)
+    assert isinstance(errors[0], FakeError)
+
+
+def test_property_writes_are_coalesced(qapp, context):
+    xproto = context.xproto
+    context.atoms.prefetch(["_NET_WM_OPAQUE_REGION"])
+    context.requests.arriveAll()
+    waitUntil(qapp, lambda: context.atoms.request("_NET_WM_OPAQUE_REGION") is None)
+
+    for i in range(100):
+        context.setProperty(1, "_NET_WM_OPAQUE_REGION", CARDINAL, [0, 0, i, i])
+
+    qapp.processEvents()
+    writes = [i for i in xproto.calls if i[0] == "ChangeProperty"]
+    assert writes == [("ChangeProperty", 1, 100)]
+    assert xproto.properties[(1, 100)] == (0, 0, 99, 99)
+    assert context.propertyWriteCount == 1
+
+    # the last request wins
+    context.setProperty(1, "_NET_WM_OPAQUE_REGION", CARDINAL, [1, 1, 1, 1])
+    context.deleteProperty(1, "_NET_WM_OPAQUE_REGION")
+    qapp.processEvents()
+    assert xproto.calls[-1] == ("DeleteProperty", 1, 100)
+    assert (1, 100) not in xproto.properties
+
+
+def test_property_write_waits_for_atom(qapp, context):
+    xproto = context.xproto
+    context.setProperty(1, "_GTK_FRAME_EXTENTS", CARDINAL, [12] * 4)
+
+    qapp.processEvents()
+    assert [i[0] for i in xproto.calls] == ["InternAtom"]
+    assert context.propertyWriteCount == 0
+
+    context.requests.arriveAll()
+    assert waitUntil(qapp, lambda: context.propertyWriteCount == 1)
+    assert xproto.properties[(1, 100)] == (12,) * 4
+    assert context.requests.blockCount == 0
+
+
+def test_failed_atom_is_interned_again(qapp, context):
+    xproto = context.xproto
+    xproto.badAtoms.add("_GTK_FRAME_EXTENTS")
+    context.setProperty(1, "_GTK_FRAME_EXTENTS", CARDINAL, [12] * 4)
+    qapp.processEvents()
+
+    # the property whose atom fails is dropped instead of being pending forever
+    context.requests.arriveAll()
+    assert waitUntil(qapp, lambda: not context._pendingProperties)
+    assert context.propertyWriteCount == 0
+
+    xproto.badAtoms.clear()
+    context.setProperty(1, "_GTK_FRAME_EXTENTS", CARDINAL, [12] * 4)
+    qapp.processEvents()
+    context.requests.arriveAll()
+    assert waitUntil(qapp, lambda: context.propertyWriteCount == 1)
+    assert [i[0] for i in xproto.calls].count("InternAtom") == 2
+
+
+def test_reply_is_awaitable(qapp, pipeline):
+    reply = pipeline.submit(pipeline.xproto.InternAtom(False, 1, "A"))
+
+    async def pump():
+        while not reply.isFinished():
+            qapp.processEvents()
+            await asyncio.sleep(0.001)
+
+    async def main():
+        pipeline.arriveAll()
+        task = asyncio.create_task(pump())
+        result = await reply
+        await task
+        return result.atom
+
+    assert asyncio.run(main()) == 100
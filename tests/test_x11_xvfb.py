@@ -0,0 +1,182 @@
+# coding:utf-8
+""" Tests of the X11 paths against a real X server, they are skipped if `Xvfb` is not installed """
+import json
+import os
+import shutil
+import subprocess
+import sys
+import textwrap
+from importlib.util import find_spec
+
+import pytest
+
+pytestmark = pytest.mark.skipif(
+    sys.platform != "linux" or shutil.which("Xvfb") is None or find_spec("xcffib") is None,
+    reason="Xvfb and xcffib are required"
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# the Qt application of pytest process uses the offscreen platform, so the
+# X11 code runs in a child process connected to Xvfb
+SCRIPT = textwrap.dedent("""
+    import json, time
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtWidgets import QApplication, QWidget
+
+    app = QApplication([])
+
+    from qframelesswindow import AcrylicWindow, FramelessWindow
+    from qframelesswindow.utils.linux_utils import X11Context, isPlatformX11
+
+    CARDINAL = 6
+    result = {"isPlatformX11": isPlatformX11()}
+
+    def waitUntil(condition, timeout=3):
+        end = time.monotonic() + timeout
+        while not condition() and time.monotonic() < end:
+            app.processEvents()
+            time.sleep(0.001)
+
+        return condition()
+
+    # the 32-bit values of property once the pending writes are sent, `None` if it's not set
+    def readProperty(windowId, name):
+        waitUntil(lambda: not context._pendingProperties, 1)
+        reply = context.getProperty(windowId, name).result()
+        return list(reply.value.to_atoms()) if reply.type else None
+
+    def showWindow(window):
+        window.show()
+        waitUntil(lambda: window.windowHandle() is not None and window.isVisible())
+        return int(window.winId())
+
+    context = X11Context.instance()
+    context.atoms.prefetch()
+    result["isPrefetched"] = waitUntil(lambda: all(context.atoms.request(i) is None for i in context.atoms.names))
+
+    widget = QWidget()
+    widget.show()
+    waitUntil(widget.isVisible)
+    windowId = int(widget.winId())
+
+    # coalesced property writes
+    count = context.propertyWriteCount
+    for i in range(50):
+        context.setProperty(windowId, "_NET_WM_OPAQUE_REGION", CARDINAL, [0, 0, i, i])
+
+    waitUntil(lambda: context.propertyWriteCount > count)
+    app.processEvents()
+    result["writes"] = context.propertyWriteCount - count
+    reply = context.getProperty(windowId, "_NET_WM_OPAQUE_REGION", CARDINAL, 4)
+    result["opaqueRegion"] = list(reply.result().value.to_atoms())
+
+    # asynchronous replies are delivered in request order
+    order = []
+    first = context.getProperty(context.rootWindow, "_NET_WM_OPAQUE_REGION")
+    second = context.getProperty(windowId, "_NET_WM_OPAQUE_REGION", CARDINAL, 4)
+    first.then(lambda r: order.append("first"))
+    second.then(lambda r: order.append("second"))
+    waitUntil(second.isFinished)
+    result["order"] = order
+
+    # errors fail the reply instead of raising in the event loop
+    errors = []
+    bad = context.getProperty(0x1fffffff, "_NET_WM_OPAQUE_REGION")
+    bad.failed.connect(lambda e: errors.append(type(e).__name__))
+    waitUntil(bad.isFinished)
+    result["errors"] = errors
+
+    # the opaque region of opaque and translucent windows
+    opaque = FramelessWindow()
+    opaque.resize(300, 200)
+    result["opaqueWindowRegion"] = readProperty(showWindow(opaque), "_NET_WM_OPAQUE_REGION")
+
+    translucent = FramelessWindow()
+    translucent.setAttribute(Qt.WA_TranslucentBackground)
+    translucent.resize(300, 200)
+    result["translucentWindowRegion"] = readProperty(showWindow(translucent), "_NET_WM_OPAQUE_REGION")
+
+    # client-side shadow publishes the frame extents and excludes its margins from the opaque region
+    window = FramelessWindow()
+    window.windowEffect.addShadowEffect(window.winId(), radius=10)
+    window.resize(300, 200)
+    windowId = showWindow(window)
+    result["frameExtents"] = readProperty(windowId, "_GTK_FRAME_EXTENTS")
+    result["shadowWindowRegion"] = readProperty(windowId, "_NET_WM_OPAQUE_REGION")
+
+    # the compositor is only bypassed while the window is maximized or in full screen
+    bypass = FramelessWindow()
+    bypass.setBypassCompositorEnabled(True)
+    bypassStates = [readProperty(showWindow(bypass), "_NET_WM_BYPASS_COMPOSITOR")]
+    for show in (bypass.showMaximized, bypass.showNormal, bypass.showFullScreen, bypass.showNormal):
+        show()
+        bypassStates.append(readProperty(int(bypass.winId()), "_NET_WM_BYPASS_COMPOSITOR"))
+
+    result["bypassStates"] = bypassStates
+
+    # the blur region excludes the shadow margins, and it's written once for a resize storm
+    acrylic = AcrylicWindow()
+    acrylic.windowEffect.addShadowEffect(acrylic.winId(), radius=10)
+    acrylic.resize(300, 200)
+    windowId = showWindow(acrylic)
+    result["blurRegion"] = readProperty(windowId, "_KDE_NET_WM_BLUR_BEHIND_REGION")
+
+    count = context.propertyWriteCount
+    for i in range(1, 51):
+        acrylic.resize(300 + i, 200 + i)
+
+    context.flushProperties()
+    result["resizeWrites"] = context.propertyWriteCount - count
+
+    # the configure events of the storm may resize the window again before it settles
+    result["isBlurRegionResized"] = waitUntil(
+        lambda: readProperty(windowId, "_KDE_NET_WM_BLUR_BEHIND_REGION") == [10, 10, 330, 230])
+    result["pending"] = context.requests.pendingCount()
+
+    print(json.dumps(result))
+""")
+
+
+@pytest.fixture(scope="module")
+def display():
+    readFd, writeFd = os.pipe()
+    process = subprocess.Popen(
+        ["Xvfb", "-displayfd", str(writeFd), "-screen", "0", "1024x768x24", "-nolisten", "tcp"],
+        pass_fds=(writeFd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.close(writeFd)
+
+    with os.fdopen(readFd) as f:
+        number = f.readline().strip()
+
+    if not number:
+        process.kill()
+        pytest.skip("Xvfb failed to start")
+
+    yield ":" + number
+    process.terminate()
+    process.wait()
+
+
+def test_x11_paths_on_xvfb(display):
+    env = dict(os.environ, DISPLAY=display, QT_QPA_PLATFORM="xcb", PYTHONPATH=ROOT)
+    process = subprocess.run(
+        [sys.executable, "-c", SCRIPT], env=env, capture_output=True, text=True, timeout=60)
+    assert process.returncode == 0, process.stderr
+
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    assert result["isPlatformX11"]
+    assert result["isPrefetched"]
+    assert result["writes"] == 1
+    assert result["opaqueRegion"] == [0, 0, 49, 49]
+    assert result["order"] == ["first", "second"]
+    assert result["errors"] == ["WindowError"]
+    assert result["opaqueWindowRegion"] == [0, 0, 300, 200]
+    assert result["translucentWindowRegion"] == []
+    assert result["frameExtents"] == [10] * 4
+    assert result["shadowWindowRegion"] == [10, 10, 280, 180]
+    assert result["bypassStates"] == [None, [1], None, [1], None]
+    assert result["blurRegion"] == [10, 10, 280, 180]
+    assert result["resizeWrites"] == 1
+    assert result["isBlurRegionResized"]
+    assert result["pending"] == 0